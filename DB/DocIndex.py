@@ -0,0 +1,164 @@
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+from doc_sections import iter_sections
+from relevance import symbol_tokens
+
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+_lock = threading.Lock()
+_index = None
+
+
+class DocIndex:
+    """
+    On-disk inverted index over the mirrored documentation pages, one SQLite
+    file. Terms come from relevance.symbol_tokens, so ChatOpenAI matches
+    chatopenai, chat, open and ai, and model_dump_json matches itself and
+    its parts. Pages are ranked with BM25 within one framework.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                " id INTEGER PRIMARY KEY, framework TEXT, url TEXT, title TEXT, text TEXT, html TEXT, length INTEGER);"
+                "CREATE INDEX IF NOT EXISTS docs_framework ON docs (framework);"
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " framework TEXT, term TEXT, doc_id INTEGER, tf INTEGER,"
+                " PRIMARY KEY (framework, term, doc_id)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS terms ("
+                " framework TEXT, term TEXT, df INTEGER, PRIMARY KEY (framework, term)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS stats (framework TEXT PRIMARY KEY, docs INTEGER, avg_length REAL);"
+                "CREATE TABLE IF NOT EXISTS sections ("
+                " id INTEGER PRIMARY KEY, framework TEXT, doc_id INTEGER, anchor TEXT, heading TEXT, level INTEGER, text TEXT);"
+                "CREATE INDEX IF NOT EXISTS sections_framework ON sections (framework);"
+                "CREATE TABLE IF NOT EXISTS symbols ("
+                " framework TEXT, symbol TEXT, section_id INTEGER, rank INTEGER,"
+                " PRIMARY KEY (framework, symbol, section_id)) WITHOUT ROWID;"
+            )
+
+    def _conn(self):
+        # sqlite3 connections must not be shared between threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def build(self, framework, pages):
+        """Replaces the framework's pages with pages, dicts with url, title, text and html."""
+        df = Counter()
+        lengths = []
+        with self._conn() as conn:
+            self._delete(conn, framework)
+            for page in pages:
+                counts = Counter(symbol_tokens(f"{page['title']}\n{page['text']}"))
+                doc_id = conn.execute(
+                    "INSERT INTO docs (framework, url, title, text, html, length) VALUES (?, ?, ?, ?, ?, ?)",
+                    (framework, page["url"], page["title"], page["text"], page.get("html"), sum(counts.values())),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                    [(framework, term, doc_id, tf) for term, tf in counts.items()],
+                )
+                if page.get("html"):
+                    self._add_sections(conn, framework, doc_id, page["html"])
+                df.update(counts.keys())
+                lengths.append(sum(counts.values()))
+            conn.executemany("INSERT INTO terms VALUES (?, ?, ?)", [(framework, term, n) for term, n in df.items()])
+            conn.execute(
+                "INSERT INTO stats VALUES (?, ?, ?)",
+                (framework, len(lengths), sum(lengths) / len(lengths) if lengths else 0.0),
+            )
+        self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return len(lengths)
+
+    @staticmethod
+    def _add_sections(conn, framework, doc_id, html):
+        for section in iter_sections(html):
+            section_id = conn.execute(
+                "INSERT INTO sections (framework, doc_id, anchor, heading, level, text) VALUES (?, ?, ?, ?, ?, ?)",
+                (framework, doc_id, section["anchor"], section["heading"], section["level"], section["text"]),
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO symbols VALUES (?, ?, ?, ?)",
+                [(framework, symbol, section_id, rank) for symbol, rank in section["symbols"].items()],
+            )
+
+    @staticmethod
+    def _delete(conn, framework):
+        for table in ("docs", "postings", "terms", "stats", "sections", "symbols"):
+            conn.execute(f"DELETE FROM {table} WHERE framework = ?", (framework,))
+
+    def frameworks(self):
+        return dict(self._conn().execute("SELECT framework, docs FROM stats").fetchall())
+
+    def sections(self, framework, symbol, max_matches=2):
+        """
+        Sections documenting symbol (matched case-insensitively, also by its
+        trailing dotted components) as dicts with url, anchor, heading and
+        text. Empty when there is none, or when more than max_matches
+        sections match equally well, e.g. a method name many classes share.
+        """
+        rows = self._conn().execute(
+            "SELECT k.rank, d.url, s.anchor, s.heading, s.text FROM symbols k"
+            " JOIN sections s ON s.id = k.section_id JOIN docs d ON d.id = s.doc_id"
+            " WHERE k.framework = ? AND k.symbol = ? ORDER BY k.rank, s.level, length(s.text)",
+            (framework, symbol.strip().lower()),
+        ).fetchall()
+        best = [row for row in rows if row[0] == rows[0][0]] if rows else []
+        if len(best) > max_matches:
+            return []
+        return [{"url": url, "anchor": anchor, "heading": heading, "text": text} for _, url, anchor, heading, text in best]
+
+    def search(self, framework, query, k=3):
+        """Best k pages for query as dicts with url, title, text, html and score."""
+        conn = self._conn()
+        terms = list(dict.fromkeys(symbol_tokens(query)))
+        stats = conn.execute("SELECT docs, avg_length FROM stats WHERE framework = ?", (framework,)).fetchone()
+        if not terms or not stats or not stats[0]:
+            return []
+        n_docs, avg_length = stats
+        placeholders = ",".join("?" * len(terms))
+        idf = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in conn.execute(
+                f"SELECT term, df FROM terms WHERE framework = ? AND term IN ({placeholders})", (framework, *terms)
+            )
+        }
+        if not idf:
+            return []
+        scores = Counter()
+        for term, doc_id, tf, length in conn.execute(
+            f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.doc_id"
+            f" WHERE p.framework = ? AND p.term IN ({placeholders})", (framework, *terms)
+        ):
+            scores[doc_id] += idf[term] * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+        hits = []
+        for doc_id, score in scores.most_common(k):
+            url, title, text, html = conn.execute(
+                "SELECT url, title, text, html FROM docs WHERE id = ?", (doc_id,)
+            ).fetchone()
+            hits.append({"url": url, "title": title, "text": text, "html": html, "score": score})
+        return hits
+
+
+def get_doc_index():
+    """The index at DOCS_INDEX_PATH, or None when it has not been built (or DOCS_INDEX=0)."""
+    global _index
+    path = os.getenv("DOCS_INDEX_PATH", "DB/docs_index.sqlite3")
+    if os.getenv("DOCS_INDEX", "1") == "0" or not os.path.exists(path):
+        return None
+    with _lock:
+        if _index is None or _index.path != path:
+            _index = DocIndex(path)
+        return _index
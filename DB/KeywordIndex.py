@@ -0,0 +1,131 @@
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DIM = int(os.getenv("SIMILAR_KEYWORD_DIM", "512"))
+THRESHOLD = float(os.getenv("SIMILAR_KEYWORD_THRESHOLD", "0.9"))
+# Seconds between reloads of the process-wide index from the store, so that
+# keywords cached by other workers and processes become matchable.
+REFRESH_SECONDS = float(os.getenv("SIMILAR_KEYWORD_REFRESH", "300"))
+
+_lock = threading.Lock()
+_index = None
+_loaded_at = 0.0
+_refreshing = False
+
+
+def embed(keyword, dim=DIM):
+    """
+    Hashed character trigrams of the keyword lowercased without separators,
+    L2-normalized. No model and no training: ChatOpenAI, chat_openai and
+    ChatOpenAI() embed identically, different identifiers share few trigrams.
+    """
+    text = "^" + re.sub(r"[^a-z0-9.]", "", keyword.lower()) + "$"
+    vector = np.zeros(dim, dtype=np.float32)
+    for i in range(len(text) - 2):
+        vector[zlib.crc32(text[i:i + 3].encode("utf-8")) % dim] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def candidates(keyword):
+    """The keyword, then for a dotted one its owner and its last component: ChatOpenAI.invoke -> ChatOpenAI, invoke."""
+    keyword = keyword.strip()
+    if "." not in keyword.strip("."):
+        return [keyword]
+    owner, _, member = keyword.strip(".").rpartition(".")
+    return [keyword, owner, member]
+
+
+class KeywordIndex:
+    """
+    Per framework, a matrix of embedded cached keywords, searched with one
+    matrix-vector product per candidate. Rows added since the last query
+    are stacked on first use.
+    """
+
+    def __init__(self, dim=DIM):
+        self.dim = dim
+        self._keywords = {}
+        self._matrices = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, framework, keyword):
+        with self._lock:
+            keywords = self._keywords.setdefault(framework, {})
+            if keyword in keywords:
+                return
+            keywords[keyword] = len(keywords)
+            self._pending.setdefault(framework, []).append(keyword)
+
+    def _matrix(self, framework):
+        pending = self._pending.pop(framework, None)
+        matrix = self._matrices.get(framework)
+        if pending:
+            rows = np.stack([embed(keyword, self.dim) for keyword in pending])
+            matrix = rows if matrix is None else np.vstack([matrix, rows])
+            self._matrices[framework] = matrix
+        return matrix
+
+    def nearest(self, framework, keyword, threshold=THRESHOLD):
+        """
+        (cached keyword, similarity) for the first of candidates(keyword)
+        with a cached keyword at least threshold similar, else None.
+        """
+        with self._lock:
+            matrix = self._matrix(framework)
+            if matrix is None:
+                return None
+            keywords = list(self._keywords[framework])
+        for candidate in candidates(keyword):
+            scores = matrix @ embed(candidate, self.dim)
+            best = int(np.argmax(scores))
+            if scores[best] >= threshold and keywords[best] != keyword:
+                return keywords[best], float(scores[best])
+        return None
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(keywords) for keywords in self._keywords.values())
+
+
+def load_keyword_index(store):
+    index = KeywordIndex()
+    for framework, keyword in store.keywords():
+        index.add(framework, keyword)
+    return index
+
+
+def get_keyword_index(store):
+    """
+    Process-wide index, loaded from the store's keys on first use and
+    reloaded every REFRESH_SECONDS. One caller reloads while the others keep
+    using the current index. None when SIMILAR_KEYWORDS=0.
+    """
+    global _index, _loaded_at, _refreshing
+    if os.getenv("SIMILAR_KEYWORDS", "1") == "0":
+        return None
+    with _lock:
+        if _index is None:
+            _index, _loaded_at = load_keyword_index(store), time.monotonic()
+            return _index
+        if _refreshing or time.monotonic() - _loaded_at < REFRESH_SECONDS:
+            return _index
+        _refreshing = True
+    fresh = None
+    try:
+        fresh = load_keyword_index(store)
+    except Exception as e:
+        print(f"Keeping the keyword index, reload failed: {e}")
+    finally:
+        with _lock:
+            if fresh is not None:
+                _index = fresh
+            _loaded_at = time.monotonic()
+            _refreshing = False
+    return _index
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU bounded by the total size in bytes of its
+    keys and values rather than by entry count, so a handful of huge pages
+    cannot crowd out memory while many small extracts still fit. Entries
+    may carry an expiry (a Unix timestamp); expired entries are misses.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(key, value):
+        return len(key.encode("utf-8")) + len(value.encode("utf-8"))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            value = entry[0]
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, expires_at=None):
+        size = self._size(key, value)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                self._bytes -= self._size(old_key, old_value)
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= self._size(key, entry[0])
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+            }
@@ -1,34 +1,167 @@
-import redis
+import os
+import threading
+import time
+from DB.LRUCache import LRUCache
+from DB.backends import RedisBackend, backend_from_env
+
+# Bump (or set MINISTORE_CACHE_VERSION) when prompts, models or page parsing
+# change; entries written under another version are no longer read and are
+# removed by DB.compact.
+CACHE_VERSION = os.getenv("MINISTORE_CACHE_VERSION", "1")
+
+DAY = 24 * 60 * 60
+# Discussion forums change faster than reference docs. Keys are framework
+# names, or the prefix before "_" (e.g. "GitHub" for "GitHub_langchain").
+# A TTL of 0 means the entry never expires.
+DEFAULT_TTLS = {
+    "OpenAI": 7 * DAY,
+    "GitHub": 7 * DAY,
+}
+DEFAULT_TTL = 30 * DAY
+# Framework name under which chunking caches LLM extractions, keyed by content
+# hash rather than by a keyword the agent looks up.
+EXTRACTION_NAMESPACE = "Extraction"
+# How long the in-process tier may serve an entry without asking the backend,
+# so deletes, overwrites and DB.compact runs from other processes are seen.
+LOCAL_CACHE_MAX_AGE = int(os.getenv("MINISTORE_LOCAL_CACHE_MAX_AGE", "300"))
+
+
+def ttl_for(framework):
+    """TTL in seconds; MINISTORE_TTL_<FRAMEWORK> overrides the defaults."""
+    base = framework.split("_", 1)[0]
+    for name in (framework, base):
+        override = os.getenv(f"MINISTORE_TTL_{name.upper()}")
+        if override is not None:
+            return int(override)
+    for name in (framework, base):
+        if name in DEFAULT_TTLS:
+            return DEFAULT_TTLS[name]
+    return int(os.getenv("MINISTORE_DEFAULT_TTL", str(DEFAULT_TTL)))
+
+
+_lock = threading.Lock()
+_store = None
+
 
 class MiniStore:
-    def __init__(self, host='localhost', port=6379, db=0):
-        self.r = redis.Redis(host=host, port=port, db=db, decode_responses=True)
+    def __init__(self, host='localhost', port=6379, db=0, client=None, local_cache_bytes=None, backend=None):
+        if backend is None:
+            backend = RedisBackend(host, port, db, client=client)
+        self.backend = backend
+        if local_cache_bytes is None:
+            local_cache_bytes = int(os.getenv("MINISTORE_LOCAL_CACHE_BYTES", str(32 * 1024 * 1024)))
+        # In-process tier in front of the backend; hot keywords never leave the process.
+        self.local = LRUCache(local_cache_bytes) if local_cache_bytes > 0 else None
 
     def _make_key(self, framework, keyword):
-        return f"{framework}_{keyword}"
+        return f"v{CACHE_VERSION}:{framework}_{keyword}"
+
+    def _fields(self, framework, keyword, text):
+        return {"framework": framework, "keyword": keyword, "text": text, "created_at": int(time.time())}
+
+    def _remember(self, key, text, framework, created_at=None):
+        """Keeps text in the in-process tier until the entry's TTL or LOCAL_CACHE_MAX_AGE runs out."""
+        if self.local is None or text is None:
+            return
+        now = time.time()
+        expires_at = now + LOCAL_CACHE_MAX_AGE
+        ttl = ttl_for(framework)
+        if ttl > 0:
+            expires_at = min(expires_at, (created_at or now) + ttl)
+        self.local.put(key, text, expires_at)
 
-    def save(self, framework, keyword, text):
+    def _recall(self, key):
+        return self.local.get(key) if self.local is not None else None
+
+    def save(self, framework, keyword, text, overwrite=False):
         key = self._make_key(framework, keyword)
-        if self.r.exists(key):
-            return False  
-        self.r.hset(key, mapping={
-            "framework": framework,
-            "keyword": keyword,
-            "text": text
-        })
-        return True
+        fields = self._fields(framework, keyword, text)
+        saved = self.backend.save(key, fields, ttl_for(framework), overwrite)
+        if saved:
+            self._remember(key, text, framework, fields["created_at"])
+        return saved
 
     def get(self, framework, keyword):
         key = self._make_key(framework, keyword)
-        data = self.r.hgetall(key)
-        return data['text'] if data else None
+        text = self._recall(key)
+        if text is None:
+            text = self.backend.get(key)
+            self._remember(key, text, framework)
+        return text
+
+    def get_many(self, pairs):
+        """Texts for a list of (framework, keyword) pairs, None where missing."""
+        keys = [self._make_key(framework, keyword) for framework, keyword in pairs]
+        texts = [self._recall(key) for key in keys]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        if missing:
+            for i, text in zip(missing, self.backend.get_many([keys[i] for i in missing])):
+                texts[i] = text
+                self._remember(keys[i], text, pairs[i][0])
+        return texts
+
+    def save_many(self, entries):
+        """Saves (framework, keyword, text) triples; returns which were new."""
+        saved = self.backend.save_many([
+            (self._make_key(framework, keyword), self._fields(framework, keyword, text), ttl_for(framework))
+            for framework, keyword, text in entries
+        ])
+        for (framework, keyword, text), new in zip(entries, saved):
+            if new:
+                self._remember(self._make_key(framework, keyword), text, framework)
+        return saved
 
     def exists(self, framework, keyword):
         key = self._make_key(framework, keyword)
-        return self.r.exists(key) > 0
+        return self.backend.exists(key)
 
     def delete(self, framework, keyword):
         key = self._make_key(framework, keyword)
-        return self.r.delete(key) > 0
+        if self.local is not None:
+            self.local.discard(key)
+        return self.backend.delete([key]) > 0
+
+    def entries(self, batch=500):
+        """
+        Yields (key, version, framework, created_at, size_bytes) for every cache
+        entry, including ones written under other versions. Keys written before
+        versioning have version None; created_at is None when unknown.
+        """
+        for key, framework, created_at, text in self.backend.scan(batch):
+            version = key.split(":", 1)[0][1:] if key.startswith("v") and ":" in key else None
+            yield key, version, framework, created_at, len(key.encode("utf-8")) + len(text.encode("utf-8"))
+
+    def keywords(self, batch=500):
+        """
+        Yields (framework, keyword) for every tool entry of the current cache
+        version. Only keys are read, and cached extractions are skipped.
+        """
+        for key, framework, keyword in self.backend.scan_keywords(batch):
+            if framework != EXTRACTION_NAMESPACE and key == self._make_key(framework, keyword):
+                yield framework, keyword
+
+    def delete_keys(self, keys):
+        for key in keys:
+            if self.local is not None:
+                self.local.discard(key)
+        return self.backend.delete(keys)
+
+    def lock(self, framework, keyword, timeout=300):
+        """Lock on one entry shared by every process using the same backend."""
+        return self.backend.lock(self._make_key(framework, keyword), timeout)
+
+    def purge_expired(self):
+        return self.backend.purge_expired()
+
+    def cache_stats(self):
+        """Hit, miss and eviction counters of the in-process tier."""
+        return self.local.stats() if self.local is not None else {}
 
 
+def get_store():
+    """Process-wide MiniStore shared by all tools."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = MiniStore(backend=backend_from_env())
+        return _store
@@ -0,0 +1,313 @@
+"""
+Storage backends for MiniStore. A backend stores one record per key with the
+fields framework, keyword, text and created_at, and implements:
+
+    get(key) -> text or None
+    get_many(keys) -> [text or None, ...]
+    save(key, fields, ttl, overwrite=False) -> True if written
+    save_many([(key, fields, ttl), ...]) -> [bool, ...]
+    exists(key) -> bool
+    delete(keys) -> number deleted
+    scan(batch) -> yields (key, framework, created_at, text) for live entries
+    scan_keywords(batch) -> yields (key, framework, keyword) for live entries, without their text
+    purge_expired() -> number of expired entries removed
+    lock(key, timeout) -> context manager held across processes
+"""
+import fcntl
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import redis
+
+# Writes the hash and its TTL in one atomic round-trip. Unless ARGV[1] is "1"
+# an existing entry is left untouched. ARGV[2] is the TTL in seconds.
+SAVE_IF_ABSENT = """
+local exists = redis.call('EXISTS', KEYS[1]) == 1
+if exists and ARGV[1] ~= '1' then
+    return 0
+end
+if exists then
+    redis.call('DEL', KEYS[1])
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+if tonumber(ARGV[2]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(host, port, db):
+    with _pools_lock:
+        key = (host, port, db)
+        if key not in _pools:
+            # Blocking so that a burst of worker threads waits for a free
+            # connection instead of failing once the pool is exhausted.
+            _pools[key] = redis.BlockingConnectionPool(
+                host=host, port=port, db=db, decode_responses=True,
+                max_connections=32, timeout=20,
+            )
+        return _pools[key]
+
+
+class RedisBackend:
+    def __init__(self, host='localhost', port=6379, db=0, client=None):
+        self.r = client if client is not None else redis.Redis(connection_pool=_get_pool(host, port, db))
+        self._save_if_absent = self.r.register_script(SAVE_IF_ABSENT)
+
+    @staticmethod
+    def _args(fields, ttl, overwrite):
+        args = ["1" if overwrite else "0", ttl]
+        for name, value in fields.items():
+            args += [name, value]
+        return args
+
+    def get(self, key):
+        return self.r.hget(key, "text")
+
+    def get_many(self, keys):
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hget(key, "text")
+        return pipe.execute()
+
+    def save(self, key, fields, ttl, overwrite=False):
+        return bool(self._save_if_absent(keys=[key], args=self._args(fields, ttl, overwrite)))
+
+    def save_many(self, items):
+        pipe = self.r.pipeline(transaction=False)
+        for key, fields, ttl in items:
+            self._save_if_absent(keys=[key], args=self._args(fields, ttl, False), client=pipe)
+        return [bool(saved) for saved in pipe.execute()]
+
+    def exists(self, key):
+        return self.r.exists(key) > 0
+
+    def delete(self, keys):
+        return self.r.delete(*keys) if keys else 0
+
+    def scan(self, batch=500):
+        keys = []
+        for key in self.r.scan_iter(count=batch, _type="HASH"):
+            keys.append(key)
+            if len(keys) >= batch:
+                yield from self._describe(keys)
+                keys = []
+        if keys:
+            yield from self._describe(keys)
+
+    def _describe(self, keys):
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(key, "framework", "created_at", "text")
+        for key, (framework, created_at, text) in zip(keys, pipe.execute()):
+            if text is None:
+                continue  # not a MiniStore hash, or expired since the scan
+            yield key, framework, int(created_at) if created_at else None, text
+
+    def scan_keywords(self, batch=500):
+        keys = []
+        for key in self.r.scan_iter(count=batch, _type="HASH"):
+            keys.append(key)
+            if len(keys) >= batch:
+                yield from self._describe_keywords(keys)
+                keys = []
+        if keys:
+            yield from self._describe_keywords(keys)
+
+    def _describe_keywords(self, keys):
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(key, "framework", "keyword")
+        for key, (framework, keyword) in zip(keys, pipe.execute()):
+            if framework is not None and keyword is not None:
+                yield key, framework, keyword
+
+    def purge_expired(self):
+        return 0  # Redis expires keys itself
+
+    @contextmanager
+    def lock(self, key, timeout):
+        # Expires on its own if the holder dies mid-fetch; while the holder is
+        # alive it is extended every timeout/3 seconds, so a slow fetch keeps it.
+        lock = self.r.lock(f"lock:{key}", timeout=timeout, blocking_timeout=timeout, thread_local=False)
+        if not lock.acquire():
+            raise TimeoutError(f"Timed out waiting for lock on {key}")
+        done = threading.Event()
+
+        def keep_alive():
+            while not done.wait(timeout / 3):
+                try:
+                    lock.extend(timeout, replace_ttl=True)
+                except redis.exceptions.LockError:
+                    return
+
+        threading.Thread(target=keep_alive, name="ministore-lock", daemon=True).start()
+        try:
+            yield
+        finally:
+            done.set()
+            try:
+                lock.release()
+            except redis.exceptions.LockNotOwnedError:
+                pass  # expired anyway; the result is saved either way
+
+
+class SQLiteBackend:
+    """
+    Embedded backend in a single SQLite file in WAL mode. Any number of
+    processes can read concurrently while one writes, so workers can share a
+    cache without running redis-server. Expired rows are skipped on read and
+    replaced on write; DB.compact removes them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, framework TEXT, keyword TEXT, text TEXT,"
+                " created_at INTEGER, expires_at INTEGER)"
+            )
+
+    def _conn(self):
+        # sqlite3 connections must not be shared between threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(key, fields, ttl):
+        created_at = int(fields["created_at"])
+        return (key, fields["framework"], fields["keyword"], fields["text"], created_at,
+                created_at + int(ttl) if int(ttl) > 0 else None)
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT text FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, int(time.time())),
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys):
+        found = {}
+        now = int(time.time())
+        conn = self._conn()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, text FROM entries WHERE key IN ({','.join('?' * len(chunk))})"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (*chunk, now),
+            ).fetchall()
+            found.update(rows)
+        return [found.get(key) for key in keys]
+
+    def _insert(self, conn, key, fields, ttl, overwrite):
+        if overwrite:
+            cursor = conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", self._row(key, fields, ttl))
+        else:
+            # Only an expired row may be replaced; a live one wins.
+            cursor = conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET"
+                " framework = excluded.framework, keyword = excluded.keyword, text = excluded.text,"
+                " created_at = excluded.created_at, expires_at = excluded.expires_at"
+                " WHERE entries.expires_at IS NOT NULL AND entries.expires_at <= ?",
+                (*self._row(key, fields, ttl), int(time.time())),
+            )
+        return cursor.rowcount > 0
+
+    def save(self, key, fields, ttl, overwrite=False):
+        with self._conn() as conn:
+            return self._insert(conn, key, fields, ttl, overwrite)
+
+    def save_many(self, items):
+        with self._conn() as conn:
+            return [self._insert(conn, key, fields, ttl, False) for key, fields, ttl in items]
+
+    def exists(self, key):
+        return self.get(key) is not None
+
+    def delete(self, keys):
+        if not keys:
+            return 0
+        with self._conn() as conn:
+            return conn.execute(
+                f"DELETE FROM entries WHERE key IN ({','.join('?' * len(keys))})", list(keys)
+            ).rowcount
+
+    def scan(self, batch=500):
+        cursor = self._conn().execute(
+            "SELECT key, framework, created_at, text FROM entries WHERE expires_at IS NULL OR expires_at > ?",
+            (int(time.time()),),
+        )
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            yield from rows
+
+    def scan_keywords(self, batch=500):
+        cursor = self._conn().execute(
+            "SELECT key, framework, keyword FROM entries WHERE expires_at IS NULL OR expires_at > ?",
+            (int(time.time()),),
+        )
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            yield from rows
+
+    def purge_expired(self):
+        with self._conn() as conn:
+            return conn.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (int(time.time()),)
+            ).rowcount
+
+    @contextmanager
+    def lock(self, key, timeout):
+        # An flock on a per-key file next to the database; the OS releases it
+        # if the holder dies.
+        lock_dir = self.path + ".locks"
+        os.makedirs(lock_dir, exist_ok=True)
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        deadline = time.monotonic() + timeout
+        with open(os.path.join(lock_dir, name), "w") as f:
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timed out waiting for lock on {key}")
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def backend_from_env():
+    """MINISTORE_BACKEND=redis (default) or sqlite (at MINISTORE_SQLITE_PATH)."""
+    kind = os.getenv("MINISTORE_BACKEND", "redis").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("MINISTORE_SQLITE_PATH", "DB/ministore.sqlite3"))
+    if kind == "redis":
+        return RedisBackend(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=int(os.getenv("REDIS_DB", "0")),
+        )
+    raise ValueError(f"Unsupported MINISTORE_BACKEND: {kind}")
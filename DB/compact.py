@@ -0,0 +1,81 @@
+"""
+Reports the MiniStore footprint and evicts entries that are stale.
+An entry is stale when it was written under another cache version, is older
+than --max-age-days, or is among the oldest entries once the total exceeds
+--max-mb.
+
+    python -m DB.compact --max-age-days 30 --max-mb 512 --dry-run
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from DB.MiniStore import CACHE_VERSION, get_store
+
+
+def compact(store, max_age=None, max_bytes=None, dry_run=False):
+    now = time.time()
+    expired = 0 if dry_run else store.purge_expired()
+    entries = list(store.entries())
+    by_framework = defaultdict(lambda: [0, 0])
+    evict = {}
+
+    for key, version, framework, created_at, size in entries:
+        by_framework[framework or "?"][0] += 1
+        by_framework[framework or "?"][1] += size
+        if version != CACHE_VERSION:
+            evict[key] = "version"
+        elif max_age is not None and (created_at is None or now - created_at > max_age):
+            evict[key] = "age"
+
+    kept = [entry for entry in entries if entry[0] not in evict]
+    total = sum(entry[4] for entry in kept)
+    if max_bytes is not None and total > max_bytes:
+        # Oldest first; entries without a timestamp count as oldest.
+        for key, _, _, _, size in sorted(kept, key=lambda entry: entry[3] or 0):
+            if total <= max_bytes:
+                break
+            evict[key] = "size"
+            total -= size
+
+    if not dry_run:
+        keys = list(evict)
+        for start in range(0, len(keys), 500):
+            store.delete_keys(keys[start:start + 500])
+
+    reasons = defaultdict(int)
+    for reason in evict.values():
+        reasons[reason] += 1
+    return {
+        "entries": len(entries),
+        "bytes": sum(entry[4] for entry in entries),
+        "by_framework": {name: {"entries": n, "bytes": b} for name, (n, b) in sorted(by_framework.items())},
+        "expired": expired,
+        "evicted": len(evict),
+        "evicted_by_reason": dict(reasons),
+        "bytes_after": total,
+        "dry_run": dry_run,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-age-days", type=float, default=None)
+    parser.add_argument("--max-mb", type=float, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be evicted.")
+    args = parser.parse_args()
+
+    report = compact(
+        get_store(),
+        max_age=args.max_age_days * 24 * 60 * 60 if args.max_age_days is not None else None,
+        max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None,
+        dry_run=args.dry_run,
+    )
+    print(f"{report['entries']} entries, {report['bytes'] / 1024:.1f} KiB (cache version {CACHE_VERSION})")
+    for framework, usage in report["by_framework"].items():
+        print(f"  {framework:<24} {usage['entries']:>6} entries {usage['bytes'] / 1024:>10.1f} KiB")
+    action = "Would evict" if args.dry_run else "Evicted"
+    if report["expired"]:
+        print(f"Removed {report['expired']} expired entries")
+    print(f"{action} {report['evicted']} entries {report['evicted_by_reason']}, "
+          f"{report['bytes_after'] / 1024:.1f} KiB left")
@@ -0,0 +1,166 @@
+"""
+Classification pass through the OpenAI Batch API. Every post that has been
+reasoned about but not classified (status "reasoned" in the results file) is
+written to batch-job JSONL files, submitted, polled until done, and mapped
+back to its post ID by custom_id. The state file records each batch ID as
+soon as it is submitted, so an interrupted run re-attaches to those and only
+submits the files that have none yet, instead of paying twice.
+OPENAI_BASE_URL points it at another endpoint, e.g. benchmarks/mock_llm_server.py.
+
+    python run_agent.py --classify skip --output results.jsonl
+    python batch_label.py --results results.jsonl
+"""
+import argparse
+import json
+import os
+import time
+
+import llm_clients
+from label import RECORD_FIELDS, classification_request, parse_function_call, prediction_record
+from rate_limit import call_with_retries
+from result_sink import JsonlSink
+
+ENDPOINT = "/v1/chat/completions"
+BATCH_MAX_REQUESTS = 50_000  # per batch file, the provider's limit
+POLL_INTERVAL = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+TERMINAL = {"completed", "failed", "expired", "cancelled"}
+ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def batch_line(custom_id, post_text, answer_text, model):
+    messages, kwargs = classification_request(post_text, answer_text, "openai")
+    body = {"model": model, "messages": [{"role": ROLES[m.type], "content": m.content} for m in messages], **kwargs}
+    return {"custom_id": str(custom_id), "method": "POST", "url": ENDPOINT, "body": body}
+
+
+def write_batch_files(lines, prefix):
+    paths = []
+    for start in range(0, len(lines), BATCH_MAX_REQUESTS):
+        path = f"{prefix}.{len(paths)}.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for line in lines[start:start + BATCH_MAX_REQUESTS]:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        paths.append(path)
+    return paths
+
+
+def submit(client, path):
+    with open(path, "rb") as f:
+        uploaded = call_with_retries(lambda: client.files.create(file=f, purpose="batch"), "openai")
+    batch = call_with_retries(
+        lambda: client.batches.create(input_file_id=uploaded.id, endpoint=ENDPOINT, completion_window="24h"), "openai"
+    )
+    print(f"Submitted batch {batch.id} ({path})")
+    return batch.id
+
+
+def save_state(state_path, state):
+    # Replaced in one step, so a crash mid-write leaves the previous state.
+    with open(state_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def wait_for(client, batch_ids, poll_interval=None):
+    poll_interval = POLL_INTERVAL if poll_interval is None else poll_interval
+    batches = {}
+    while True:
+        for batch_id in batch_ids:
+            if batch_id in batches and batches[batch_id].status in TERMINAL:
+                continue
+            batch = call_with_retries(lambda: client.batches.retrieve(batch_id), "openai")
+            batches[batch_id] = batch
+            counts = batch.request_counts
+            progress = f" {counts.completed + counts.failed}/{counts.total}" if counts else ""
+            print(f"Batch {batch_id}: {batch.status}{progress}")
+        if all(batch.status in TERMINAL for batch in batches.values()):
+            return list(batches.values())
+        time.sleep(poll_interval)
+
+
+def read_results(client, batch):
+    """Prediction per custom_id; failed requests map to {"error": ...}."""
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        text = call_with_retries(lambda: client.files.content(file_id).text, "openai")
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                results[record["custom_id"]] = {"error": str(record.get("error") or response.get("body"))}
+                continue
+            message = response["body"]["choices"][0]["message"]
+            results[record["custom_id"]] = parse_function_call(message.get("function_call"), message.get("content") or "")
+    return results
+
+
+def classify_batch(items, model, state_path, poll_interval=None):
+    """
+    Classifies (post_id, post_text, answer_text) items in provider batch jobs.
+    Returns {str(post_id): prediction}.
+    """
+    client = llm_clients.get_client("openai")
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if isinstance(state["batches"], list):  # written by an older version, after every submit
+            state["batches"] = dict(zip(state["files"], state["batches"]))
+        print(f"Re-attaching to {len(state['batches'])} submitted batches from {state_path}")
+    else:
+        lines = [batch_line(post_id, post_text, answer_text, model) for post_id, post_text, answer_text in items]
+        state = {"files": write_batch_files(lines, state_path), "batches": {}}
+        save_state(state_path, state)
+
+    for path in state["files"]:
+        if path not in state["batches"]:
+            state["batches"][path] = submit(client, path)
+            save_state(state_path, state)
+
+    predictions = {}
+    for batch in wait_for(client, [state["batches"][path] for path in state["files"]], poll_interval):
+        if batch.status != "completed":
+            print(f"Batch {batch.id} ended as {batch.status}")
+        predictions.update(read_results(client, batch))
+    for path in state["files"] + [state_path]:
+        if os.path.exists(path):
+            os.remove(path)
+    return predictions
+
+
+def classify_reasoned(sink, model, poll_interval=None):
+    """Classifies every "reasoned" record of sink and writes the results to it. Returns (ok, failed)."""
+    reasoned = [record for record in sink.records().values() if record.get("status") == "reasoned"]
+    if not reasoned:
+        print("No posts waiting for classification")
+        return 0, 0
+    print(f"Classifying {len(reasoned)} posts in batch mode")
+    predictions = classify_batch(
+        [(record["id"], record["post"], record["reasoning"]) for record in reasoned],
+        model, sink.path + ".batch", poll_interval,
+    )
+    ok = failed = 0
+    for record in reasoned:
+        prediction = predictions.get(str(record["id"]), {"error": "missing from batch output"})
+        try:
+            sink.write(prediction_record(record["id"], record["reasoning"], prediction))
+            ok += 1
+        except KeyError:
+            sink.write({"id": record["id"], "reasoning": record["reasoning"], **{field: "N/A" for field in RECORD_FIELDS},
+                        "error": prediction.get("error") or prediction.get("raw_response")}, status="error")
+            failed += 1
+    print(f"Batch classification: {ok} classified, {failed} failed")
+    return ok, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", default="results.jsonl", help="JSONL written by run_agent.py --classify skip.")
+    parser.add_argument("--model", default="o3-mini-2025-01-31")
+    parser.add_argument("--poll-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    classify_reasoned(JsonlSink(args.results), args.model, args.poll_seconds)
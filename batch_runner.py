@@ -0,0 +1,194 @@
+import os
+import queue
+import statistics
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# Process-wide cap on posts being worked on at once, shared by every batch run
+# so that nested or parallel runs cannot multiply the number of open LLM calls.
+_in_flight = threading.BoundedSemaphore(int(os.getenv("MAX_IN_FLIGHT", "8")))
+
+
+def set_max_in_flight(limit):
+    global _in_flight
+    _in_flight = threading.BoundedSemaphore(limit)
+
+
+def run_batch(items, process, max_workers=4, key=None, on_error=None, on_result=None):
+    """
+    Runs process(item) for every item on a thread pool.
+    Results come back in input order, whatever order the workers finish in.
+    key(item) gives the post ID used in logs; on_error(item, exc) builds the
+    result for a failed item (the exception is re-raised if it is None).
+    on_result(item, result, failed) is called from the worker as soon as each
+    item finishes, e.g. to stream results to a sink.
+    Returns (results, stats) where stats holds the run's throughput.
+    """
+    key = key or (lambda item: item)
+    items = list(items)
+    results = [None] * len(items)
+    semaphore = _in_flight
+
+    def worker(index, item):
+        try:
+            failed = False
+            try:
+                results[index] = process(item)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                print(f"Error processing post ID {key(item)}: {e}")
+                traceback.print_exc()
+                failed = True
+                results[index] = on_error(item, e)
+            if on_result is not None:
+                on_result(item, results[index], failed)
+        finally:
+            semaphore.release()
+
+    start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for index, item in enumerate(items):
+            # Blocks the submitting loop once the global cap is reached.
+            semaphore.acquire()
+            futures.append(pool.submit(worker, index, item))
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "count": len(items),
+        "elapsed": elapsed,
+        "throughput": len(items) / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"Processed {stats['count']} posts in {elapsed:.2f}s "
+          f"({stats['throughput']:.2f} posts/s, {max_workers} workers)")
+    return results, stats
+
+
+_DONE = object()
+
+
+def _stage_stats(latencies, waits):
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+        "queue_wait": statistics.fmean(waits),
+    }
+
+
+def run_pipeline(items, stages, queue_size=8, key=None, on_error=None, on_result=None):
+    """
+    Runs every item through stages, a list of (name, fn, workers). The first
+    fn gets the item and each later one the previous stage's output, so item
+    N+1 can be in the first stage while item N is in the second. Stages are
+    joined by queues of at most queue_size items: a slow stage blocks the one
+    feeding it instead of letting work pile up. The global in-flight cap
+    covers an item from entering the first stage to leaving the last.
+    key, on_error and on_result are as for run_batch; a failed item skips
+    the remaining stages. Returns (results, stats) where stats adds the
+    latency and queue wait of each stage.
+    """
+    key = key or (lambda item: item)
+    items = list(items)
+    results = [None] * len(items)
+    semaphore = _in_flight
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    latencies = [[] for _ in stages]
+    waits = [[] for _ in stages]
+    running = [workers for _, _, workers in stages]
+    errors = []
+    lock = threading.Lock()
+
+    def finish(index, item, value, error=None):
+        # Ends an item: value is its result, or error what made a stage fail.
+        # An exception from on_error or on_result is recorded like a failed
+        # item without on_error, so the worker carries on with the next item.
+        try:
+            if error is not None:
+                if on_error is None:
+                    raise error
+                value = on_error(item, error)
+            results[index] = value
+            if on_result is not None:
+                on_result(item, value, error is not None)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        finally:
+            semaphore.release()
+
+    def worker(stage):
+        name, fn, _ = stages[stage]
+        try:
+            while True:
+                entry = queues[stage].get()
+                if entry is _DONE:
+                    break
+                index, item, value, queued_at = entry
+                started = time.perf_counter()
+                try:
+                    value = fn(value)
+                except Exception as e:
+                    print(f"Error processing post ID {key(item)} in stage {name}: {e}")
+                    traceback.print_exc()
+                    finish(index, item, None, e)
+                    continue
+                finished = time.perf_counter()
+                with lock:
+                    latencies[stage].append(finished - started)
+                    waits[stage].append(started - queued_at)
+                if stage + 1 < len(stages):
+                    queues[stage + 1].put((index, item, value, finished))
+                else:
+                    finish(index, item, value)
+        finally:
+            with lock:
+                running[stage] -= 1
+                last = running[stage] == 0
+            # The last worker out tells every worker of the next stage to stop.
+            if last and stage + 1 < len(stages):
+                for _ in range(stages[stage + 1][2]):
+                    queues[stage + 1].put(_DONE)
+
+    threads = [
+        threading.Thread(target=worker, args=(stage,), name=f"{name}-{n}", daemon=True)
+        for stage, (name, _, workers) in enumerate(stages)
+        for n in range(workers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for index, item in enumerate(items):
+        semaphore.acquire()
+        queues[0].put((index, item, item, time.perf_counter()))
+    for _ in range(stages[0][2]):
+        queues[0].put(_DONE)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+
+    stats = {
+        "count": len(items),
+        "elapsed": elapsed,
+        "throughput": len(items) / elapsed if elapsed > 0 else 0.0,
+        "stages": {name: _stage_stats(latencies[stage], waits[stage]) for stage, (name, _, _) in enumerate(stages)},
+    }
+    print(f"Processed {stats['count']} posts in {elapsed:.2f}s ({stats['throughput']:.2f} posts/s, "
+          + ", ".join(f"{name}: {workers} workers" for name, _, workers in stages) + ")")
+    for name, stage in stats["stages"].items():
+        if stage["count"]:
+            print(f"  {name}: mean {stage['mean']:.2f}s  p50 {stage['p50']:.2f}s  p95 {stage['p95']:.2f}s  "
+                  f"queue wait {stage['queue_wait']:.2f}s")
+    return results, stats
@@ -0,0 +1,68 @@
+"""
+get/save throughput of the MiniStore backends: Redis (a local redis-server,
+or fakeredis with --fake) against the embedded SQLite backend. The last
+column reads from several processes at once to show concurrent readers.
+
+    python -m benchmarks.bench_backends --ops 5000 --readers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from multiprocessing import Pool
+
+from DB.MiniStore import MiniStore
+from DB.backends import RedisBackend, SQLiteBackend
+
+TEXT = "x" * 1024
+
+
+def make_store(kind, path=None):
+    if kind == "sqlite":
+        return MiniStore(backend=SQLiteBackend(path), local_cache_bytes=0)
+    if kind == "fakeredis":
+        import fakeredis
+        return MiniStore(backend=RedisBackend(client=fakeredis.FakeRedis(decode_responses=True)), local_cache_bytes=0)
+    return MiniStore(local_cache_bytes=0)
+
+
+def read_all(args):
+    kind, path, keys = args
+    store = make_store(kind, path)
+    for key in keys:
+        store.get("Bench", key)
+    return len(keys)
+
+
+def rate(n, fn):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def run(kind, ops, readers):
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3") if kind == "sqlite" else None
+    store = make_store(kind, path)
+    keys = [f"key_{i}" for i in range(ops)]
+    save = rate(ops, lambda: [store.save("Bench", key, TEXT) for key in keys])
+    get = rate(ops, lambda: [store.get("Bench", key) for key in keys])
+    get_many = rate(ops, lambda: store.get_many([("Bench", key) for key in keys]))
+    concurrent = None
+    if kind != "fakeredis":  # fakeredis state is per process
+        with Pool(readers) as pool:
+            concurrent = rate(ops * readers, lambda: pool.map(read_all, [(kind, path, keys)] * readers))
+    store.delete_keys([store._make_key("Bench", key) for key in keys])
+    concurrent = f"{concurrent:9.0f}/s" if concurrent is not None else "      n/a"
+    print(f"{kind:>9}: save {save:9.0f}/s  get {get:9.0f}/s  get_many {get_many:9.0f}/s  "
+          f"{readers} readers {concurrent}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--fake", action="store_true", help="Use fakeredis instead of a redis-server.")
+    args = parser.parse_args()
+
+    run("fakeredis" if args.fake else "redis", args.ops, args.readers)
+    run("sqlite", args.ops, args.readers)
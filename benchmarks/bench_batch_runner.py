@@ -0,0 +1,58 @@
+"""
+End-to-end throughput of the batch runner against a stubbed chat model.
+Every LLM round-trip sleeps a fixed latency, so the numbers only reflect how
+well the runner overlaps posts, not provider speed.
+
+    python -m benchmarks.bench_batch_runner --posts 40 --latency 0.2 --workers 1 8
+"""
+import argparse
+import json
+
+from langchain.agents import Tool, initialize_agent
+from langchain_core.language_models import FakeListChatModel
+
+from batch_runner import run_batch
+from label import classify_post_and_answer
+
+CLASSIFICATION = json.dumps({
+    "bug_type": "API Bug (APIB)",
+    "Language": "Python",
+    "Component": "Agent Core",
+    "Framework": "Langchain",
+    "root_cause": "API Limitation (AL)",
+    "effect": "Crash",
+    "bug_type_rational": "stub",
+    "root_cause_rational": "stub",
+    "effect_rational": "stub",
+})
+
+
+# The stub agent answers straight away, so this tool is never called.
+ECHO_TOOL = Tool(name="Echo", func=lambda query: query, description="Returns its input.")
+
+
+def make_process(latency):
+    def process(post):
+        # One stub model per post: FakeListChatModel cycles its responses with
+        # a shared index, which would interleave between threads.
+        agent_llm = FakeListChatModel(responses=["Thought: done\nFinal Answer: stub reasoning"], sleep=latency)
+        label_llm = FakeListChatModel(responses=[CLASSIFICATION], sleep=latency)
+        agent = initialize_agent(tools=[ECHO_TOOL], llm=agent_llm, agent="zero-shot-react-description")
+        reasoning = agent.run(post["body"])
+        prediction = classify_post_and_answer(post["body"], reasoning, label_llm, "claude")
+        return {"id": post["id"], "reasoning": reasoning, **prediction}
+    return process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per stub LLM call.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    posts = [{"id": i, "body": f"post {i}"} for i in range(args.posts)]
+    for workers in args.workers:
+        results, stats = run_batch(posts, make_process(args.latency), max_workers=workers, key=lambda p: p["id"])
+        assert [r["id"] for r in results] == [p["id"] for p in posts]
+        print(f"workers={workers}: {stats['throughput']:.2f} posts/s")
@@ -0,0 +1,67 @@
+"""
+Per-query latency of a fresh Chrome per lookup (the old scraper behaviour)
+versus borrowing sessions from the shared BrowserPool, against a static local
+HTML fixture. Needs Chrome and chromedriver.
+
+    python -m benchmarks.bench_browser_pool --queries 20
+"""
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixture_server import FixtureServer
+from tools.browser_pool import BrowserPool, make_chrome_driver
+
+PAGES = {
+    "/": ("text/html", "<html><body><div id='main'>Static fixture page about ChatOpenAI.</div></body></html>"),
+}
+
+
+def query(driver, base_url):
+    driver.get(base_url + "/")
+    return driver.find_element(By.ID, "main").text
+
+
+def fresh_driver(base_url, n):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        driver = make_chrome_driver()
+        try:
+            query(driver, base_url)
+        finally:
+            driver.quit()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def pooled(base_url, n):
+    pool = BrowserPool(max_size=1)
+    timings = []
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            with pool.session() as driver:
+                query(driver, base_url)
+            timings.append(time.perf_counter() - start)
+    finally:
+        pool.close()
+    return timings
+
+
+def report(name, timings):
+    print(f"{name:>6}: mean {statistics.mean(timings) * 1000:.0f} ms, "
+          f"median {statistics.median(timings) * 1000:.0f} ms, "
+          f"first {timings[0] * 1000:.0f} ms over {len(timings)} queries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    with FixtureServer(PAGES) as base_url:
+        report("fresh", fresh_driver(base_url, args.queries))
+        report("pooled", pooled(base_url, args.queries))
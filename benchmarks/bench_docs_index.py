@@ -0,0 +1,101 @@
+"""
+Builds the docs mirror and index from synthetic documentation pages served
+locally, then reports ingestion time, index build time and query latency for
+symbol lookups, how often the top hit is the page defining the symbol, and
+how many lookups the section index answers without an extraction LLM call.
+
+    python -m benchmarks.bench_docs_index --pages 500 --queries 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import docs_mirror
+from benchmarks.fixture_server import FixtureServer
+from DB.DocIndex import DocIndex
+
+WORDS = ("agent tool memory retriever chain prompt model message callback stream graph node state "
+         "config schema field validator serializer index query embedding vector store loader").split()
+
+
+def symbol(i):
+    return f"{random.choice(WORDS).title()}{random.choice(WORDS).title()}{i}"
+
+
+def make_site(n_pages, seed=0):
+    """Pages of path -> (content_type, body), each defining one class and method, plus a sitemap."""
+    random.seed(seed)
+    pages, symbols = {}, {}
+    for i in range(n_pages):
+        name = symbol(i)
+        method = f"{random.choice(WORDS)}_{random.choice(WORDS)}_{i}"
+        filler = " ".join(random.choices(WORDS, k=400))
+        path = f"/docs/{name.lower()}"
+        pages[path] = ("text/html", f"""<html><head><title>{name}</title></head><body>
+<nav>Docs / Reference</nav>
+<main><h1>{name}</h1>
+<p>{filler}</p>
+<h2 id="{method}">{name}.{method}</h2>
+<pre>result = {name}(config).{method}(messages)</pre>
+<p>{filler}</p>
+<p>See also {symbol(random.randrange(n_pages))}.</p></main>
+</body></html>""")
+        symbols[name] = path
+        symbols[f"{name}.{method}"] = path
+    return pages, symbols
+
+
+def percentile(values, q):
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    pages, symbols = make_site(args.pages)
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(pages) as base_url:
+        pages["/sitemap.xml"] = ("application/xml", "<urlset>" + "".join(
+            f"<url><loc>{base_url}{path}</loc></url>" for path in list(pages)) + "</urlset>")
+        docs_mirror.CORPUS_DIR = tmp
+        index = DocIndex(os.path.join(tmp, "index.sqlite3"))
+
+        start = time.perf_counter()
+        mirrored = docs_mirror.mirror("Bench", f"{base_url}/sitemap.xml", workers=args.workers)
+        mirror_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        docs_mirror.build_index(index, "Bench")
+        build_seconds = time.perf_counter() - start
+        size = os.path.getsize(index.path)
+
+        queries = random.choices(list(symbols), k=args.queries)
+        timings, section_timings, hits, exact = [], [], 0, 0
+        for query in queries:
+            start = time.perf_counter()
+            results = index.search("Bench", query, k=2)
+            timings.append(time.perf_counter() - start)
+            hits += bool(results) and results[0]["url"].endswith(symbols[query])
+            start = time.perf_counter()
+            sections = index.sections("Bench", query)
+            section_timings.append(time.perf_counter() - start)
+            exact += len(sections) == 1 and sections[0]["url"].endswith(symbols[query])
+
+    print(f"Mirrored {mirrored} pages in {mirror_seconds:.2f}s ({mirrored / mirror_seconds:.0f} pages/s)")
+    print(f"Index build: {build_seconds:.2f}s, {size / 1e6:.1f} MB")
+    print(f"Query latency over {len(queries)} lookups: p50 {percentile(timings, 0.5) * 1000:.2f} ms, "
+          f"p95 {percentile(timings, 0.95) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms, "
+          f"mean {statistics.mean(timings) * 1000:.2f} ms")
+    print(f"Top hit is the defining page: {hits / len(queries):.1%}")
+    print(f"Section lookups: p50 {percentile(section_timings, 0.5) * 1000:.2f} ms, "
+          f"p95 {percentile(section_timings, 0.95) * 1000:.2f} ms; "
+          f"answered with the exact section (no extraction call): {exact / len(queries):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Wall-clock of extract_info_about_target on a long page with a stub LLM of
+fixed latency, for several extraction pool sizes. Token counting is
+approximated so the benchmark runs without downloading tiktoken encodings.
+
+    python -m benchmarks.bench_extraction --chunks 13 --latency-ms 200
+"""
+import argparse
+import time
+
+import chunking
+
+PARAGRAPH = "The ChatOpenAI constructor accepts model, temperature and max_tokens. " * 20
+
+
+def stub_llm(latency):
+    def call_llm(prompt, model="stub"):
+        time.sleep(latency)
+        return prompt.rsplit("Input:", 1)[1][:40]
+    return call_llm
+
+
+def approx_token_counts(texts, model=None):
+    return [chunking.approx_tokens(text) for text in texts]
+
+
+def run(workers, text):
+    chunking.configure_extraction(workers)
+    start = time.perf_counter()
+    chunking.extract_info_about_target(text, "ChatOpenAI")
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=13)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    chunking.call_llm = stub_llm(args.latency_ms / 1000)
+    chunking.count_tokens_batch = approx_token_counts
+    chunking.EXTRACTION_CACHE = False  # every run extracts the same text
+    paragraphs_per_chunk = 3000 // chunking.approx_tokens(PARAGRAPH)
+    text = "\n\n".join([PARAGRAPH] * (paragraphs_per_chunk * args.chunks))
+
+    baseline = None
+    for workers in args.workers:
+        elapsed = run(workers, text)
+        baseline = baseline or elapsed
+        print(f"{workers:>2} workers: {elapsed:6.2f}s  ({baseline / elapsed:4.1f}x)")
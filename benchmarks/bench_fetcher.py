@@ -0,0 +1,63 @@
+"""
+Latency of the plain-HTTP fetch path versus Chrome for a recorded
+documentation page served locally. The browser column needs Chrome and
+chromedriver; pass --no-browser to time the HTTP path alone.
+
+    python -m benchmarks.bench_fetcher --lookups 50
+"""
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixture_server import FixtureServer
+from tools.browser_pool import BrowserPool
+from tools.fetcher import http_text
+
+RECORDED_PAGE = ("text/html", """<html><head><title>ChatOpenAI</title></head><body>
+<nav>Docs / Integrations / Chat models</nav>
+<div id="main">
+<h1>ChatOpenAI</h1>
+<p>This notebook provides a quick overview for getting started with OpenAI chat models.</p>
+<h2 id="instantiation">Instantiation</h2>
+<pre>llm = ChatOpenAI(model="gpt-4o", temperature=0, max_tokens=None, timeout=None, max_retries=2)</pre>
+<h2 id="invocation">Invocation</h2>
+<pre>ai_msg = llm.invoke(messages)</pre>
+</div>
+</body></html>""")
+
+
+def timed(fn, n):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        text = fn()
+        timings.append(time.perf_counter() - start)
+        assert "ChatOpenAI" in text
+    return timings
+
+
+def report(name, timings):
+    print(f"{name:>7}: mean {statistics.mean(timings) * 1000:7.1f} ms, median {statistics.median(timings) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--no-browser", action="store_true")
+    args = parser.parse_args()
+
+    with FixtureServer({"/docs/chat/openai": RECORDED_PAGE}) as base_url:
+        url = base_url + "/docs/chat/openai"
+        report("http", timed(lambda: http_text(url, "#main"), args.lookups))
+        if not args.no_browser:
+            pool = BrowserPool(max_size=1)
+            try:
+                def browser_lookup():
+                    with pool.session() as driver:
+                        driver.get(url)
+                        return driver.find_element(By.ID, "main").text
+                report("browser", timed(browser_lookup, args.lookups))
+            finally:
+                pool.close()
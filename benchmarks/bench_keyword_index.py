@@ -0,0 +1,115 @@
+"""
+Recall and latency of near-duplicate keyword lookups (DB/KeywordIndex.py) on
+a synthetic corpus of cached API names. Positive queries are spelling
+variants of a cached keyword (snake_case, lowercase, call parentheses,
+members, module-qualified names); negative queries are other names built
+from the same vocabulary, which must not be served from the cache. Queries
+that are cached themselves would be exact hits and are left out.
+
+    python -m benchmarks.bench_keyword_index --cached 5000 --queries 2000
+"""
+import argparse
+import random
+import time
+
+from DB.KeywordIndex import THRESHOLD, KeywordIndex
+
+WORDS = ("chat open ai anthropic azure base model agent executor tool memory retriever vector store index "
+         "query engine prompt template runnable lambda parallel graph state node document loader "
+         "embedding output parser callback handler settings field validator").split()
+THRESHOLDS = (0.7, 0.75, 0.8, 0.85, 0.9, 0.95)
+
+
+def make_name(rng):
+    words = rng.sample(WORDS, rng.randint(2, 3))
+    if rng.random() < 0.5:
+        return "".join(word.title() for word in words)
+    return "_".join(words)
+
+
+def variant(name, rng):
+    """A spelling of name other than name itself (that would be an exact cache hit)."""
+    words = [w.lower() for w in (name.split("_") if "_" in name else
+                                 [name[i:j] for i, j in _camel_spans(name)])]
+    return rng.choice([v for v in (
+        "_".join(words),
+        "".join(word.title() for word in words),
+        name.lower(),
+        f"{name}()",
+        f"{name}.{rng.choice(['invoke', 'run', 'from_documents'])}",
+        f"{rng.choice(['langchain', 'llama_index.core', 'pydantic'])}.{name}",
+    ) if v != name])
+
+
+def _camel_spans(name):
+    starts = [i for i, c in enumerate(name) if c.isupper()] + [len(name)]
+    return list(zip(starts, starts[1:]))
+
+
+def key(name):
+    """Spellings of one name that are interchangeable, e.g. chat_open and ChatOpen."""
+    return name.replace("_", "").lower()
+
+
+def percentile(values, q):
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cached", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cached = set()
+    while len(cached) < args.cached:
+        cached.add(make_name(rng))
+    cached = sorted(cached)
+    canonical = {key(name) for name in cached}
+
+    index = KeywordIndex()
+    start = time.perf_counter()
+    for name in cached:
+        index.add("Bench", name)
+    index.nearest("Bench", "warmup")
+    build = time.perf_counter() - start
+
+    positives = []
+    cached_set = set(cached)
+    while len(positives) < args.queries:
+        name = rng.choice(cached)
+        query = variant(name, rng)
+        if query not in cached_set:
+            positives.append((query, name))
+    negatives = []
+    while len(negatives) < args.queries:
+        name = make_name(rng)
+        if key(name) not in canonical:
+            negatives.append(name)
+
+    print(f"{len(cached)} cached keywords, index built in {build * 1000:.0f} ms")
+    print(f"{'threshold':>9} {'recall':>7} {'wrong':>7} {'false hits':>10}")
+    for threshold in THRESHOLDS:
+        right = wrong = 0
+        for query, name in positives:
+            match = index.nearest("Bench", query, threshold)
+            if match:
+                right += key(match[0]) == key(name)
+                wrong += key(match[0]) != key(name)
+        false_hits = sum(index.nearest("Bench", query, threshold) is not None for query in negatives)
+        marker = "  <- default" if threshold == THRESHOLD else ""
+        print(f"{threshold:>9.2f} {right / len(positives):>7.1%} {wrong / len(positives):>7.1%} "
+              f"{false_hits / len(negatives):>10.1%}{marker}")
+
+    timings = []
+    for query, _ in positives + [(query, None) for query in negatives]:
+        start = time.perf_counter()
+        index.nearest("Bench", query)
+        timings.append(time.perf_counter() - start)
+    print(f"Lookup latency: p50 {percentile(timings, 0.5) * 1000:.3f} ms, "
+          f"p95 {percentile(timings, 0.95) * 1000:.3f} ms, max {max(timings) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
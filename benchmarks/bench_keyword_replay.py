@@ -0,0 +1,116 @@
+"""
+Replays recorded agent tool calls (TOOL_CALL_LOG=tool_calls.jsonl while
+running run_agent.py) against an empty cache and reports the cache hit rate
+with the per-tool normalization the tools used before tools/keywords.py,
+with the shared canonical keys, and with canonical keys plus near-duplicate
+matching (DB/KeywordIndex.py). Without --log it replays a built-in sample of
+agent inputs.
+
+    python -m benchmarks.bench_keyword_replay --log tool_calls.jsonl
+"""
+import argparse
+import json
+import unicodedata
+from collections import defaultdict
+
+from DB.KeywordIndex import KeywordIndex
+from tools.keywords import lookup_key
+
+GITHUB_LIBRARIES = {"langchain", "langgraph", "autogen", "crewai", "langchainjs", "llamaindex", "pydantic",
+                    "semantickernel"}
+
+SAMPLE_CALLS = [
+    ("Langchain", "ChatOpenAI"), ("Langchain", "ChatOpenAI class"), ("Langchain", "chat_openai"),
+    ("Langchain", "`ChatOpenAI`"), ("Langchain", "langchain.chat_models.ChatOpenAI"),
+    ("Langchain", "ChatOpenAI(model='gpt-4o')"), ("Langchain", "AgentExecutor"), ("Langchain", "agent_executor"),
+    ("Langchain", "AgentExecutor.invoke"), ("Langchain", "create_react_agent"),
+    ("Langchain", "from langchain.agents import create_react_agent"), ("Langchain", "RecursiveCharacterTextSplitter"),
+    ("Langchain", "recursive character text splitter"), ("Langchain", "ConversationBufferMemory"),
+    ("LangGraph", "StateGraph"), ("LangGraph", "StateGraph.add_node"), ("LangGraph", "state_graph"),
+    ("LangGraph", "MemorySaver"), ("LangGraph", "langgraph.checkpoint.memory.MemorySaver"),
+    ("LLamaIndex", "VectorStoreIndex"), ("LLamaIndex", "GPTVectorStoreIndex"),
+    ("LLamaIndex", "VectorStoreIndex.from_documents"), ("LLamaIndex", "llama_index.core.VectorStoreIndex"),
+    ("LLamaIndex", "ServiceContext"), ("LLamaIndex", "service_context"), ("LLamaIndex", "Settings"),
+    ("Pydantic", "BaseModel"), ("Pydantic", "model_dump_json"), ("Pydantic", "BaseModel.model_dump_json"),
+    ("Pydantic", "pydantic.BaseModel"), ("Pydantic", "field_validator"), ("Pydantic", "@field_validator"),
+    ("Pydantic", "validator"), ("Pydantic", "BaseSettings"), ("Pydantic", "base_settings"),
+    ("CrewAI", "Crew"), ("CrewAI", "Crew.kickoff"), ("CrewAI", "Agent"), ("CrewAI", "crewai.Agent"),
+    ("Autogen", "AssistantAgent"), ("Autogen", "assistant_agent"), ("Autogen", "autogen.AssistantAgent"),
+    ("Autogen", "UserProxyAgent"), ("SemanticKernel", "Kernel"), ("SemanticKernel", "KernelFunction"),
+    ("SemanticKernel", "kernel_function"), ("LangChainJS", "ChatOpenAI"), ("LangChainJS", "RunnableSequence"),
+    ("LangChainJS", "RunnableSequence.from"),
+    ("OpenAI", "rate limit error"), ("OpenAI", "Rate limit error"), ("OpenAI", "  rate  limit error "),
+    ("OpenAI", "function calling json schema"), ("OpenAI", "Function calling JSON schema"),
+    ("GitHub", "model_dump_json_pydantic"), ("GitHub", "model_dump_json_Pydantic"),
+    ("GitHub", "ChatOpenAI_langchain"), ("GitHub", "ChatOpenAI_LangChain"), ("GitHub", "chatopenai_langchain"),
+    ("GitHub", "StateGraph_langgraph"), ("GitHub", "memory leak_llama-index"), ("GitHub", "memory leak_llama_index"),
+    ("GitHub", "AssistantAgent_pyautogen"), ("GitHub", "tool calling_crewai"), ("GitHub", "tool calling_CrewAI"),
+]
+
+
+def legacy_key(tool, raw):
+    """(framework, key) as the tools computed them before the shared module; None for rejected input."""
+    if tool == "GitHub":
+        parts = [s.strip() for s in raw.split("_")]
+        if len(parts) != 2 or not all(parts):
+            return None
+        keyword, library = parts
+        library = unicodedata.normalize("NFKC", library.strip().lower())
+        if library not in GITHUB_LIBRARIES:
+            return None
+        return f"GitHub_{library}", unicodedata.normalize("NFKC", keyword.strip())
+    if tool == "OpenAI":
+        return tool, unicodedata.normalize("NFKC", raw.strip())
+    return tool, unicodedata.normalize("NFKC", raw.split(" ")[0].strip())
+
+
+def canonical_key(tool, raw):
+    return lookup_key(tool, raw, GITHUB_LIBRARIES)
+
+
+def replay(calls, key_fn, similar=False):
+    """Per tool: [calls, hits, rejected]."""
+    seen, index = set(), KeywordIndex()
+    stats = defaultdict(lambda: [0, 0, 0])
+    for tool, raw in calls:
+        stats[tool][0] += 1
+        key = key_fn(tool, raw)
+        if key is None:
+            stats[tool][2] += 1
+        elif key in seen or (similar and index.nearest(*key)):
+            stats[tool][1] += 1
+        else:
+            seen.add(key)
+            index.add(*key)
+    return stats
+
+
+def read_log(path):
+    with open(path, encoding="utf-8") as f:
+        return [(record["tool"], record["input"] or "") for record in map(json.loads, f) if record]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log", default=None, help="JSONL written with TOOL_CALL_LOG set.")
+    args = parser.parse_args()
+    calls = read_log(args.log) if args.log else SAMPLE_CALLS
+    print(f"Replaying {len(calls)} tool calls from {args.log or 'the built-in sample'}")
+
+    runs = {
+        "legacy": replay(calls, legacy_key),
+        "canonical": replay(calls, canonical_key),
+        "canonical+similar": replay(calls, canonical_key, similar=True),
+    }
+    print(f"{'tool':<16} {'calls':>5} " + " ".join(f"{name:>18}" for name in runs))
+    for tool in sorted(runs["legacy"]):
+        row = [runs[name][tool] for name in runs]
+        print(f"{tool:<16} {row[0][0]:>5} " + " ".join(f"{hits / n:>18.0%}" for n, hits, _ in row))
+    print(f"{'total':<16} {len(calls):>5} " + " ".join(
+        f"{sum(s[1] for s in run.values()) / len(calls):>18.1%}" for run in runs.values()))
+    print("Rejected inputs: " + ", ".join(
+        f"{name} {sum(s[2] for s in run.values())}" for name, run in runs.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-call overhead of building the classification request when the prompt
+is rebuilt for every post (as before) against the cached bundle, and the
+prompt tokens billed for a dataset run with and without provider-side
+prompt caching of the shared system prefix. Tokens are estimated from text
+length unless --exact is given (needs the tiktoken encodings).
+
+    python -m benchmarks.bench_label_prompts --calls 2000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+import chunking
+import label
+
+# Billed fraction of a cached prompt token: OpenAI bills cache hits at half
+# price; Anthropic bills cache writes at 1.25x and reads at 0.1x.
+PRICING = {
+    "openai": {"write": 1.0, "read": 0.5},
+    "claude": {"write": 1.25, "read": 0.1},
+}
+
+
+def build_overhead(llm_type, calls, rebuild):
+    start = time.perf_counter()
+    for i in range(calls):
+        if rebuild:
+            label._prompt_bundle.cache_clear()
+        label.classification_request(f"post {i}", f"answer {i}", llm_type)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def prefix_text(llm_type):
+    system_message, kwargs = label._prompt_bundle(llm_type)
+    content = system_message.content
+    text = content if isinstance(content, str) else "".join(block["text"] for block in content)
+    return text + str(kwargs.get("functions", ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--exact", action="store_true")
+    args = parser.parse_args()
+    count = (lambda text: chunking.count_tokens(text)) if args.exact else chunking.approx_tokens
+
+    posts = [str(text) for text in pd.read_csv("Dataset/SO.csv")["Accepted Answer"].dropna()]
+    post_tokens = sum(count(f"<Post>{post}</Post>") for post in posts)
+
+    for llm_type, price in PRICING.items():
+        before = build_overhead(llm_type, args.calls, rebuild=True)
+        after = build_overhead(llm_type, args.calls, rebuild=False)
+        prefix = count(prefix_text(llm_type))
+        uncached = len(posts) * prefix + post_tokens
+        cached = prefix * price["write"] + (len(posts) - 1) * prefix * price["read"] + post_tokens
+        print(f"{llm_type:>6}: build {before:7.1f}us -> {after:5.1f}us per call; "
+              f"prefix {prefix} tokens; billed prompt tokens for {len(posts)} posts "
+              f"{uncached:,.0f} -> {cached:,.0f} ({cached / uncached:.0%})")
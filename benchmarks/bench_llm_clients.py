@@ -0,0 +1,68 @@
+"""
+Connections opened for a batch of LLM calls against a local mock
+OpenAI-compatible server: a new client per call (the old call_llm) against
+the shared clients of llm_clients, sync and async.
+
+    python -m benchmarks.bench_llm_clients --calls 200 --threads 8
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+import llm_clients
+from benchmarks.mock_llm_server import MockLLMServer
+
+MODEL = "o3-mini-2025-01-31"
+
+
+def client_per_call(prompt):
+    client = openai.OpenAI(api_key="mock", base_url=os.environ["OPENAI_BASE_URL"])
+    response = client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": prompt}])
+    return response.choices[0].message.content
+
+
+def shared_client(prompt):
+    return llm_clients.complete(prompt, MODEL)
+
+
+def run_threads(fn, calls, threads):
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(fn, [f"prompt {i}" for i in range(calls)]))
+
+
+async def run_async(calls, threads):
+    semaphore = asyncio.Semaphore(threads)
+
+    async def one(i):
+        async with semaphore:
+            return await llm_clients.acomplete(f"prompt {i}", MODEL)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=int, default=20)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+
+    runs = [
+        ("client per call", lambda: run_threads(client_per_call, args.calls, args.threads)),
+        ("shared (sync)", lambda: run_threads(shared_client, args.calls, args.threads)),
+        ("shared (async)", lambda: asyncio.run(run_async(args.calls, args.threads))),
+    ]
+    for name, run in runs:
+        server = MockLLMServer(latency_ms=args.latency_ms)
+        with server as base_url:
+            os.environ["OPENAI_BASE_URL"] = base_url + "/v1"
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        print(f"{name:>16}: {server.connections:4d} connections for {server.requests} calls  {elapsed:6.2f}s")
+    print(f"llm_clients: {llm_clients.connection_stats()}")
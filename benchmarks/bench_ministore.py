@@ -0,0 +1,69 @@
+"""
+Ops/sec of the old MiniStore access pattern (a fresh client per tool call,
+exists + hgetall / exists + hset) against the pooled store with single
+round-trip lookups and pipelined bulk calls.
+
+    python -m benchmarks.bench_ministore --ops 2000            # local redis-server
+    python -m benchmarks.bench_ministore --ops 2000 --fake     # in-process fakeredis
+"""
+import argparse
+import time
+
+import redis
+
+from DB.MiniStore import MiniStore
+
+
+def make_client_factory(fake):
+    if fake:
+        import fakeredis
+        server = fakeredis.FakeServer()
+        return lambda: fakeredis.FakeRedis(server=server, decode_responses=True)
+    return lambda: redis.Redis(decode_responses=True)
+
+
+def old_pattern(new_client, keys):
+    for key in keys:
+        r = new_client()
+        if not r.exists(f"Bench_{key}"):
+            r.hset(f"Bench_{key}", mapping={"framework": "Bench", "keyword": key, "text": "x" * 512})
+    for key in keys:
+        r = new_client()
+        if r.exists(f"Bench_{key}"):
+            r.hgetall(f"Bench_{key}")
+
+
+def pooled_pattern(store, keys):
+    for key in keys:
+        store.save("Bench", key, "x" * 512)
+    for key in keys:
+        store.get("Bench", key)
+
+
+def bulk_pattern(store, keys):
+    store.save_many([("Bench", key, "x" * 512) for key in keys])
+    store.get_many([("Bench", key) for key in keys])
+
+
+def timed(name, fn, ops):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>8}: {ops / elapsed:10.0f} ops/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--fake", action="store_true", help="Use fakeredis instead of a redis-server.")
+    args = parser.parse_args()
+
+    new_client = make_client_factory(args.fake)
+    store = MiniStore(client=new_client()) if args.fake else MiniStore()
+    n = args.ops // 2
+    timed("old", lambda: old_pattern(new_client, [f"old_{i}" for i in range(n)]), args.ops)
+    timed("pooled", lambda: pooled_pattern(store, [f"pooled_{i}" for i in range(n)]), args.ops)
+    timed("bulk", lambda: bulk_pattern(store, [f"bulk_{i}" for i in range(n)]), args.ops)
+    cleanup = new_client()
+    for key in cleanup.scan_iter("*Bench_*"):
+        cleanup.delete(key)
@@ -0,0 +1,39 @@
+"""
+Wall-clock of a dataset run where each post is reasoned about and then
+classified, with stub stages of fixed latency: both steps in one worker
+(run_batch) against the two-stage pipeline (run_pipeline), where the
+classification of one post overlaps with reasoning about the next.
+
+    python -m benchmarks.bench_pipeline --posts 40 --reason-ms 300 --classify-ms 150
+"""
+import argparse
+import time
+
+from batch_runner import run_batch, run_pipeline, set_max_in_flight
+
+
+def stub(latency):
+    def stage(value):
+        time.sleep(latency)
+        return value
+    return stage
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--classify-workers", type=int, default=2)
+    parser.add_argument("--reason-ms", type=int, default=300)
+    parser.add_argument("--classify-ms", type=int, default=150)
+    args = parser.parse_args()
+    set_max_in_flight(args.workers * 4)
+
+    reason, classify = stub(args.reason_ms / 1000), stub(args.classify_ms / 1000)
+    posts = list(range(args.posts))
+    _, sequential = run_batch(posts, lambda post: classify(reason(post)), max_workers=args.workers)
+    _, pipelined = run_pipeline(
+        posts, [("reason", reason, args.workers), ("classify", classify, args.classify_workers)],
+        queue_size=args.workers * 2,
+    )
+    print(f"pipeline speedup: {sequential['elapsed'] / pipelined['elapsed']:.2f}x")
@@ -0,0 +1,46 @@
+"""
+call_llm against a local mock OpenAI-compatible server that refuses every
+nth request with a 429 and Retry-After. Every call should still succeed,
+with the refusals absorbed as retries.
+
+    python -m benchmarks.bench_rate_limit --calls 100 --threads 8 --every 5
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import chunking
+import rate_limit
+from benchmarks.mock_llm_server import MockLLMServer
+
+
+def attempt(i):
+    try:
+        chunking.call_llm(f"prompt {i}")
+        return True
+    except Exception as e:
+        print(f"call {i} failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--every", type=int, default=5, help="Refuse every nth request with a 429.")
+    parser.add_argument("--retry-after", default="0.2")
+    parser.add_argument("--latency-ms", type=int, default=20)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+
+    server = MockLLMServer(latency_ms=args.latency_ms, rate_limit_every=args.every, retry_after=args.retry_after)
+    with server as base_url:
+        os.environ["OPENAI_BASE_URL"] = base_url + "/v1"
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            ok = sum(pool.map(attempt, range(args.calls)))
+        elapsed = time.perf_counter() - start
+    print(f"{ok}/{args.calls} calls succeeded in {elapsed:.2f}s; server refused {server.rate_limited} "
+          f"of {server.requests} requests")
+    print(f"rate limiting: {rate_limit.rate_limit_stats()}")
@@ -0,0 +1,62 @@
+"""
+Paragraphs/sec of token counting over the text in Dataset/*.csv: the old
+per-paragraph count (encoder looked up on every call) against the memoized
+encoder with batched encoding used by chunk_text, plus the approximate count.
+Needs the tiktoken encodings (downloaded on first use).
+
+    python -m benchmarks.bench_tokens --repeat 3
+"""
+import argparse
+import glob
+import time
+
+import pandas as pd
+import tiktoken
+
+import chunking
+
+MODEL = "o3-mini-2025-01-31"
+
+
+def dataset_paragraphs():
+    paragraphs = []
+    for path in sorted(glob.glob("Dataset/*.csv")):
+        frame = pd.read_csv(path)
+        for value in frame.to_numpy().ravel():
+            if isinstance(value, str):
+                paragraphs += [p.strip() for p in value.split("\n\n") if p.strip()]
+    return paragraphs
+
+
+def timed(fn, paragraphs):
+    start = time.perf_counter()
+    fn(paragraphs)
+    return time.perf_counter() - start
+
+
+def per_paragraph(paragraphs):
+    for paragraph in paragraphs:
+        encoding = tiktoken.encoding_for_model(MODEL)
+        len(encoding.encode(paragraph, allowed_special={"<|endoftext|>"}))
+
+
+def batched(paragraphs):
+    chunking.count_tokens_batch(paragraphs, MODEL)
+
+
+def approximate(paragraphs):
+    for paragraph in paragraphs:
+        chunking.count_tokens(paragraph, MODEL, approximate=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paragraphs = dataset_paragraphs()
+    print(f"{len(paragraphs)} paragraphs, {sum(map(len, paragraphs)) / 1e6:.1f} MB")
+    chunking.get_encoding(MODEL)  # exclude the one-off download/load
+    for name, fn in [("per paragraph", per_paragraph), ("cached + batch", batched), ("approximate", approximate)]:
+        best = min(timed(fn, paragraphs) for _ in range(args.repeat))
+        print(f"{name:>15}: {len(paragraphs) / best:12.0f} paragraphs/s")
@@ -0,0 +1,52 @@
+"""
+Fixed sleeps versus condition-driven waits on a local fixture page whose
+content is rendered by JS after a configurable delay. Needs Chrome and
+chromedriver.
+
+    python -m benchmarks.bench_waits --delays 50 300 1500 --sleep 2
+"""
+import argparse
+import time
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixture_server import FixtureServer, delayed_page
+from tools.browser_pool import BrowserPool
+from tools.waits import LatencyBudget, text_present
+
+
+def fixed_sleep(driver, url, seconds):
+    start = time.perf_counter()
+    driver.get(url)
+    time.sleep(seconds)
+    found = bool(driver.find_elements(By.ID, "content"))
+    return time.perf_counter() - start, found
+
+
+def condition_wait(driver, url, budget_seconds):
+    start = time.perf_counter()
+    budget = LatencyBudget("bench", total=budget_seconds)
+    driver.get(url)
+    found = budget.wait(driver, text_present((By.ID, "content")), "content", optional=True) is not None
+    return time.perf_counter() - start, found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delays", type=int, nargs="+", default=[50, 300, 1500], help="Render delays in ms.")
+    parser.add_argument("--sleep", type=float, default=2.0, help="Fixed sleep the old scrapers used.")
+    parser.add_argument("--budget", type=float, default=10.0)
+    args = parser.parse_args()
+
+    pages = {f"/delay/{ms}": delayed_page("ChatOpenAI reference", ms) for ms in args.delays}
+    pool = BrowserPool(max_size=1)
+    try:
+        with FixtureServer(pages) as base_url, pool.session() as driver:
+            for ms in args.delays:
+                url = f"{base_url}/delay/{ms}"
+                slept, slept_found = fixed_sleep(driver, url, args.sleep)
+                waited, waited_found = condition_wait(driver, url, args.budget)
+                print(f"delay {ms:>5} ms: sleep {slept * 1000:6.0f} ms (found={slept_found}), "
+                      f"wait {waited * 1000:6.0f} ms (found={waited_found})")
+    finally:
+        pool.close()
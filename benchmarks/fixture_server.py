@@ -0,0 +1,62 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FixtureServer:
+    """
+    Serves a dict of path -> (content_type, body) from a local thread, so the
+    scraping benchmarks never touch the real documentation sites.
+
+        with FixtureServer({"/": ("text/html", "<html>...</html>")}) as base_url:
+            ...
+    """
+
+    def __init__(self, pages, port=0):
+        self.pages = pages
+        self.requests = 0
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests += 1
+                path = self.path.split("?", 1)[0]
+                if path not in fixture.pages:
+                    self.send_error(404)
+                    return
+                content_type, body = fixture.pages[path]
+                body = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+
+def delayed_page(text, delay_ms, element_id="content"):
+    """HTML page whose content is only added by JS after delay_ms milliseconds."""
+    return ("text/html", f"""<html><body>
+<div id="loading">Loading...</div>
+<script>
+setTimeout(function () {{
+  var el = document.createElement("div");
+  el.id = "{element_id}";
+  el.textContent = {text!r};
+  document.body.appendChild(el);
+}}, {delay_ms});
+</script>
+</body></html>""")
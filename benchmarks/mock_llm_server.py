@@ -0,0 +1,162 @@
+import email.parser
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def chat_completion(body):
+    """Reply to a chat completion request; calls the requested function with the first allowed values."""
+    prompt = body.get("messages", [{}])[-1].get("content", "")
+    message = {"role": "assistant", "content": f"echo: {str(prompt)[:40]}"}
+    if body.get("functions"):
+        schema = body["functions"][0]
+        arguments = {
+            name: spec["enum"][0] if "enum" in spec else "mock"
+            for name, spec in schema["parameters"]["properties"].items()
+        }
+        message = {"role": "assistant", "content": None,
+                   "function_call": {"name": schema["name"], "arguments": json.dumps(arguments)}}
+    return {"id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model"), "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}}
+
+
+class MockLLMServer:
+    """
+    Local stand-in for the OpenAI chat completions and Anthropic messages
+    endpoints. Answers every request after latency_ms with a reply echoing the
+    start of the prompt, and counts the TCP connections clients open. With
+    rate_limit_every=n every nth request is refused with a 429 carrying
+    Retry-After: retry_after. The Batch API endpoints (/v1/files, /v1/batches)
+    run each submitted batch through the same replies; a batch reports
+    in_progress on its first poll and completed after that.
+
+        with MockLLMServer(latency_ms=50) as base_url:
+            os.environ["OPENAI_BASE_URL"] = base_url + "/v1"
+    """
+
+    def __init__(self, latency_ms=0, port=0, rate_limit_every=0, retry_after="0.1"):
+        self.latency = latency_ms / 1000
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.connections = 0
+        self.rate_limited = 0
+        self.files = {}
+        self.batches = {}
+        self._lock = threading.Lock()
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.endswith("/files"):
+                    return self.handle_files(data)
+                body = json.loads(data or b"{}")
+                if self.path.endswith("/batches"):
+                    return self.handle_batches(body)
+                with mock._lock:
+                    mock.requests += 1
+                    refuse = mock.rate_limit_every and mock.requests % mock.rate_limit_every == 0
+                    if refuse:
+                        mock.rate_limited += 1
+                if refuse:
+                    self.reply(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                               headers=[("Retry-After", mock.retry_after)])
+                    return
+                time.sleep(mock.latency)
+                if self.path.endswith("/messages"):
+                    prompt = body.get("messages", [{}])[-1].get("content", "")
+                    reply = {"id": "msg_mock", "type": "message", "role": "assistant", "model": body.get("model"),
+                             "content": [{"type": "text", "text": f"echo: {str(prompt)[:40]}"}],
+                             "stop_reason": "end_turn", "usage": {"input_tokens": 1, "output_tokens": 1}}
+                else:
+                    reply = chat_completion(body)
+                self.reply(200, reply)
+
+            def handle_files(self, data):
+                # multipart/form-data upload with the JSONL in the "file" part
+                message = email.parser.BytesParser().parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + data
+                )
+                content = next(part.get_payload(decode=True) for part in message.get_payload()
+                               if part.get_param("name", header="content-disposition") == "file")
+                return self.reply(200, mock.add_file(content.decode("utf-8"), "batch"))
+
+            def handle_batches(self, body):
+                lines = [json.loads(line) for line in mock.files[body["input_file_id"]]["content"].splitlines() if line]
+                output = [{"id": f"resp_{i}", "custom_id": line["custom_id"], "error": None,
+                           "response": {"status_code": 200, "request_id": f"req_{i}", "body": chat_completion(line["body"])}}
+                          for i, line in enumerate(lines)]
+                output_file = mock.add_file("\n".join(json.dumps(line) for line in output) + "\n", "batch_output")
+                batch = {"id": f"batch_{uuid.uuid4().hex[:12]}", "object": "batch", "endpoint": body["endpoint"],
+                         "input_file_id": body["input_file_id"], "completion_window": body["completion_window"],
+                         "created_at": int(time.time()), "status": "validating", "output_file_id": None,
+                         "error_file_id": None,
+                         "request_counts": {"total": len(lines), "completed": 0, "failed": 0}}
+                with mock._lock:
+                    mock.batches[batch["id"]] = (batch, output_file["id"])
+                return self.reply(200, batch)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/v1/batches/"):
+                    with mock._lock:
+                        batch, output_file_id = mock.batches[path.rsplit("/", 1)[1]]
+                        if batch["status"] == "validating":
+                            batch["status"] = "in_progress"
+                        else:
+                            batch.update(status="completed", output_file_id=output_file_id)
+                            batch["request_counts"]["completed"] = batch["request_counts"]["total"]
+                    return self.reply(200, batch)
+                if path.startswith("/v1/files/") and path.endswith("/content"):
+                    data = mock.files[path.split("/")[3]]["content"].encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+                self.reply(404, {"error": {"message": "not found"}})
+
+            def reply(self, status, payload, headers=()):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def add_file(self, content, purpose):
+        file = {"id": f"file-{uuid.uuid4().hex[:12]}", "object": "file", "bytes": len(content),
+                "created_at": int(time.time()), "filename": f"{purpose}.jsonl", "purpose": purpose,
+                "status": "processed"}
+        with self._lock:
+            self.files[file["id"]] = {**file, "content": content}
+        return file
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
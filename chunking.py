@@ -1,35 +1,153 @@
+import hashlib
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import unicodedata
 import openai
 import tiktoken
 from dotenv import load_dotenv
 load_dotenv() 
 openai.api_key = os.getenv("OPENAI_API_KEY")
-from anthropic import Anthropic, HUMAN_PROMPT, AI_PROMPT
+import llm_clients
+import rate_limit
+import relevance
+from DB.MiniStore import EXTRACTION_NAMESPACE, get_store
 
-def count_tokens(text, model="o3-mini-2025-01-31"):
-    text.replace("endoftext", " ") 
-    encoding = tiktoken.encoding_for_model(model)
-    return len(encoding.encode(text, allowed_special={"<|endoftext|>"}))
+ALLOWED_SPECIAL = {"<|endoftext|>"}
+# "exact" encodes a page for the single-prompt pre-check in
+# extract_info_about_target; "approx" estimates its size from its length.
+TOKEN_PRECHECK = os.getenv("TOKEN_PRECHECK", "exact")
 
-def chunk_text(text, max_tokens_per_chunk=3000, model="o3-mini-2025-01-31"):
-    chunks = []
-    current_chunk = []
+
+@lru_cache(maxsize=None)
+def get_encoding(model):
+    """tiktoken encoding for model, resolved once. Models tiktoken does not know (Claude, Gemini) use o200k_base."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def approx_tokens(text):
+    # About 4 characters per token for English prose and code.
+    return len(text) // 4 + 1
+
+def count_tokens(text, model="o3-mini-2025-01-31", approximate=False):
+    if approximate:
+        return approx_tokens(text)
+    return len(get_encoding(model).encode(text, allowed_special=ALLOWED_SPECIAL))
+
+def count_tokens_batch(texts, model="o3-mini-2025-01-31"):
+    """Token counts for many texts, encoded in one pass."""
+    encoded = get_encoding(model).encode_batch(texts, allowed_special=ALLOWED_SPECIAL)
+    return [len(tokens) for tokens in encoded]
+
+# Tokens repeated from the end of one chunk at the start of the next, so that
+# something cut at a chunk boundary is still seen whole.
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+# Oversized paragraphs are split at sentence ends, then line breaks, then
+# between tokens. The joiner puts a split level back together.
+SPLIT_LEVELS = [(re.compile(r"(?<=[.!?])\s+"), " "), (re.compile(r"\n"), "\n")]
+# "\n\n" between paragraphs of a chunk, counted as one token.
+SEPARATOR_TOKENS = 1
+
+
+def iter_paragraphs(text):
+    """Non-empty paragraphs of text, which is a string or an iterable of string pieces as they arrive."""
+    if isinstance(text, str):
+        text = [text]
+    pending = ""
+    for piece in text:
+        pending += piece
+        *complete, pending = pending.split("\n\n")
+        for paragraph in complete:
+            if paragraph.strip():
+                yield paragraph.strip()
+    if pending.strip():
+        yield pending.strip()
+
+def _counted(paragraphs, model, batch=64):
+    # Encodes a few paragraphs at a time: batched, but without waiting for the whole page.
+    group = []
+    for paragraph in paragraphs:
+        group.append(paragraph)
+        if len(group) == batch:
+            yield from zip(group, count_tokens_batch(group, model))
+            group = []
+    if group:
+        yield from zip(group, count_tokens_batch(group, model))
+
+def split_oversized(text, max_tokens, model="o3-mini-2025-01-31", level=0):
+    """Splits text into (piece, tokens) pairs of at most max_tokens tokens each."""
+    if level == len(SPLIT_LEVELS):
+        encoding = get_encoding(model)
+        tokens = encoding.encode(text, allowed_special=ALLOWED_SPECIAL)
+        return [(encoding.decode(tokens[i:i + max_tokens]), len(tokens[i:i + max_tokens]))
+                for i in range(0, len(tokens), max_tokens)]
+    pattern, joiner = SPLIT_LEVELS[level]
+    parts = [part for part in pattern.split(text) if part.strip()]
+    if len(parts) <= 1:
+        return split_oversized(text, max_tokens, model, level + 1)
+    pieces = []
+    for part, part_tokens in zip(parts, count_tokens_batch(parts, model)):
+        if part_tokens > max_tokens:
+            pieces += split_oversized(part, max_tokens, model, level + 1)
+        else:
+            pieces.append((part, part_tokens))
+    # Put neighbouring parts back together as long as they fit.
+    packed = []
+    for piece, piece_tokens in pieces:
+        if packed and packed[-1][1] + SEPARATOR_TOKENS + piece_tokens <= max_tokens:
+            packed[-1] = (packed[-1][0] + joiner + piece, packed[-1][1] + SEPARATOR_TOKENS + piece_tokens)
+        else:
+            packed.append((piece, piece_tokens))
+    return packed
+
+def iter_chunks(text, max_tokens_per_chunk=3000, model="o3-mini-2025-01-31", overlap=None):
+    """
+    Yields chunks of at most max_tokens_per_chunk tokens as soon as each is
+    complete. text is a string or an iterable of string pieces. The last
+    paragraphs of a chunk, up to overlap tokens, are repeated in the next.
+    """
+    if overlap is None:
+        overlap = CHUNK_OVERLAP_TOKENS
+    current = []  # (paragraph, tokens)
     current_tokens = 0
-    for paragraph in text.split("\n\n"):
-        paragraph = paragraph.strip()
-        if not paragraph:
-            continue
-        paragraph_tokens = count_tokens(paragraph, model=model)
-        if current_tokens + paragraph_tokens > max_tokens_per_chunk:
-            chunks.append("\n\n".join(current_chunk))
-            current_chunk = [paragraph]
-            current_tokens = paragraph_tokens
+    for paragraph, paragraph_tokens in _counted(iter_paragraphs(text), model):
+        if paragraph_tokens > max_tokens_per_chunk:
+            units = split_oversized(paragraph, max_tokens_per_chunk, model)
         else:
-            current_chunk.append(paragraph)
-            current_tokens += paragraph_tokens
-    if current_chunk:
-        chunks.append("\n\n".join(current_chunk))
-    return chunks
+            units = [(paragraph, paragraph_tokens)]
+        for unit, unit_tokens in units:
+            added = unit_tokens + (SEPARATOR_TOKENS if current else 0)
+            if current and current_tokens + added > max_tokens_per_chunk:
+                yield "\n\n".join(p for p, _ in current)
+                carried = []
+                carried_tokens = 0
+                for p, tokens in reversed(current):
+                    if carried_tokens + tokens + SEPARATOR_TOKENS > overlap:
+                        break
+                    carried.insert(0, (p, tokens))
+                    carried_tokens += tokens + SEPARATOR_TOKENS
+                # Drop overlap that would push the new unit over the cap.
+                while carried and carried_tokens + unit_tokens > max_tokens_per_chunk:
+                    carried_tokens -= carried.pop(0)[1] + SEPARATOR_TOKENS
+                current = carried
+                current_tokens = carried_tokens - SEPARATOR_TOKENS if carried else 0
+                added = unit_tokens + (SEPARATOR_TOKENS if current else 0)
+            current.append((unit, unit_tokens))
+            current_tokens += added
+    if current:
+        yield "\n\n".join(p for p, _ in current)
+
+def chunk_text(text, max_tokens_per_chunk=3000, model="o3-mini-2025-01-31", overlap=None):
+    return list(iter_chunks(text, max_tokens_per_chunk, model, overlap))
+
+# Part of every extraction cache key: bump it when make_target_prompt changes
+# so that answers to the old prompt are no longer reused.
+PROMPT_VERSION = "1"
+EXTRACTION_CACHE = os.getenv("EXTRACTION_CACHE", "1") != "0"
 
 def make_target_prompt(text_chunk, target):
     return f"""You are given part of a codebase or documentation or discussion. If it's a codebase or documentation, follow the instructions below:
@@ -49,60 +167,126 @@ Output:
 """
 
 def call_llm(prompt, model="o3-mini-2025-01-31"):
-    
-    if(model.startswith("claude")):
-        try:
-            client = Anthropic(api_key=os.getenv("CLAUDE_API_KEY"))
-            response = client.messages.create(
-                model=model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0
-            )
-            return response.content[0].text
-        except Exception as e:
-            return f"[Error calling Claude: {e}]"
-    if(model.startswith("google")):
-        try:
-            client = openai.OpenAI(base_url="https://openrouter.ai/api/v1", api_key=os.getenv("OPENROUTER_API_KEY"))
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                
-                
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            return f"[Error calling Gemini: {e}]"
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-            
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"[Error calling LLM: {e}]"
-
-def extract_info_about_target(full_text, target,  max_total_tokens=5000):
+    """
+    Completion of prompt, throttled and retried by the provider's rate
+    limiter. Raises once retries are exhausted, so failures are never cached
+    as if they were answers.
+    """
+    return rate_limit.call_with_retries(
+        lambda: llm_clients.complete(prompt, model), llm_clients.provider_for(model), tokens=approx_tokens(prompt)
+    )
+
+# Chunk prompts from every tool call share one pool, so the number of
+# extraction requests in flight stays bounded however many tools run at once.
+EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", "4"))
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def configure_extraction(max_workers):
+    global _executor, EXTRACT_MAX_WORKERS
+    with _executor_lock:
+        EXTRACT_MAX_WORKERS = max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXTRACT_MAX_WORKERS, thread_name_prefix="extract")
+        return _executor
+
+
+# Chunked extractions of this process; see extraction_stats().
+EXTRACTION_STATS = {"lookups": 0, "chunks": 0, "chunks_sent": 0, "chunks_skipped": 0, "tokens_skipped": 0,
+                    "cache_hits": 0}
+_stats_lock = threading.Lock()
+
+
+def extraction_key(model, target, chunk):
+    """
+    Content hash identifying one extraction. The target is normalized, so
+    spellings differing only in case or surrounding space share an entry.
+    """
+    target = unicodedata.normalize("NFKC", target).strip().casefold()
+    return hashlib.sha256("\0".join([model, PROMPT_VERSION, target, chunk]).encode("utf-8")).hexdigest()
+
+
+def extract_chunk(chunk, target, model):
+    """The LLM's extraction of target from chunk, reused from the cache when this chunk was seen before."""
+    if not EXTRACTION_CACHE:
+        return call_llm(make_target_prompt(chunk, target), model)
+    store = get_store()
+    key = extraction_key(model, target, chunk)
+    cached = store.get(EXTRACTION_NAMESPACE, key)
+    if cached is not None:
+        with _stats_lock:
+            EXTRACTION_STATS["cache_hits"] += 1
+        return cached
+    response = call_llm(make_target_prompt(chunk, target), model)
+    store.save(EXTRACTION_NAMESPACE, key, response)
+    return response
+
+
+def extraction_stats():
+    """cache_hits counts extractions answered without an LLM call, including ones among chunks_sent."""
+    with _stats_lock:
+        return dict(EXTRACTION_STATS)
+
+
+def _record_extraction(chunks, sent, tokens_skipped):
+    with _stats_lock:
+        EXTRACTION_STATS["lookups"] += 1
+        EXTRACTION_STATS["chunks"] += chunks
+        EXTRACTION_STATS["chunks_sent"] += sent
+        EXTRACTION_STATS["chunks_skipped"] += chunks - sent
+        EXTRACTION_STATS["tokens_skipped"] += tokens_skipped
+
+
+def extract_info_about_target(full_text, target,  max_total_tokens=5000, relevance_filter=True):
+    """
+    What full_text says about target. relevance_filter=False sends every chunk
+    to the LLM; the forum tools use it because their free-text queries rarely
+    appear verbatim in the discussion they found.
+    """
     claude_api_key = os.getenv("CLAUDE_API_KEY")
     model = "o3-mini-2025-01-31" if not claude_api_key else "claude-sonnet-4-20250514"
     model = "google/gemini-2.5-flash" if os.getenv("OPENROUTER_API_KEY") else model
-    total_tokens = count_tokens(full_text, model)
+    total_tokens = count_tokens(full_text, model, approximate=TOKEN_PRECHECK == "approx")
     if total_tokens < max_total_tokens - 1000:
-        prompt = make_target_prompt(full_text, target)
-        response = call_llm(prompt, model)
-        return response 
+        return extract_chunk(full_text, target, model)
     
-    chunks = chunk_text(full_text, max_tokens_per_chunk=3000, model=model)
+    executor = _get_executor()
+    extract = lambda chunk: extract_chunk(chunk, target, model)
+    # Chunks that mention the target are submitted as soon as the chunker
+    # yields them; the rest wait for the page to end and are ranked.
+    submitted = []  # (chunk index, future)
+    unmatched = []  # (chunk index, chunk)
+    count = 0
+    for index, chunk in enumerate(iter_chunks(full_text, max_tokens_per_chunk=3000, model=model)):
+        count += 1
+        if not (relevance_filter and relevance.RELEVANCE_FILTER) or relevance.mentions_target(chunk, target):
+            submitted.append((index, executor.submit(extract, chunk)))
+        else:
+            unmatched.append((index, chunk))
+    tokens_skipped = 0
+    if unmatched:
+        selected = relevance.select_chunks([chunk for _, chunk in unmatched], target, always_one=not submitted)
+        for i, (index, chunk) in enumerate(unmatched):
+            if i in selected:
+                submitted.append((index, executor.submit(extract, chunk)))
+            else:
+                tokens_skipped += count_tokens(chunk, model)
+    _record_extraction(count, len(submitted), tokens_skipped)
+    if count > len(submitted):
+        print(f"Relevance filter for {target!r}: extracting {len(submitted)}/{count} chunks, skipped {tokens_skipped} tokens")
+    # Responses are joined in chunk order, whatever order they finish in.
+    responses = [future.result() for _, future in sorted(submitted, key=lambda item: item[0])]
     relevant_outputs = []
-    for chunk in chunks:
-        prompt = make_target_prompt(chunk, target)
-        response = call_llm(prompt, model)
+    for response in responses:
         if response and "No relevant information found" not in response:
             relevant_outputs.append(response)
     
@@ -0,0 +1,78 @@
+"""
+Splits a documentation page into sections keyed by the API symbols they
+document. A section is a heading plus the siblings that follow it up to the
+next heading of the same or a higher level (the h2#fragment walk
+scrap_pydantic does in the browser), or a Sphinx <dt id=...> with its <dd>.
+"""
+import re
+
+from bs4 import BeautifulSoup, Tag
+
+from relevance import SYMBOL
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+PERMALINK = re.compile(r"[¶#​]+$")
+CODE_LIKE = re.compile(r"[_.]|[a-z][A-Z]")
+
+
+def _text(element):
+    return element.get_text("\n", strip=True) if isinstance(element, Tag) else str(element).strip()
+
+
+def _section_text(heading):
+    if heading.name == "dt":
+        body = heading.find_next_sibling("dd")
+        return _text(body) if body else ""
+    level = HEADINGS[heading.name]
+    parts = []
+    for sibling in heading.next_siblings:
+        if isinstance(sibling, Tag) and HEADINGS.get(sibling.name, 9) <= level:
+            break
+        text = _text(sibling)
+        if text:
+            parts.append(text)
+    return "\n".join(parts)
+
+
+def section_symbols(anchor, heading_text, code_text=""):
+    """
+    Lowercased keys a section answers to, with a rank: 0 for the symbol as
+    written, n after dropping n leading dotted components. Only identifiers
+    that look like code (snake_case, dotted, CamelCase, or set in <code>)
+    count, so prose headings such as "Getting started" add no keys.
+    """
+    candidates = SYMBOL.findall(heading_text)
+    if anchor and SYMBOL.fullmatch(anchor):
+        candidates.append(anchor)
+    keys = {}
+    for symbol in candidates:
+        if not (CODE_LIKE.search(symbol) or symbol in code_text):
+            continue
+        parts = symbol.split(".")
+        for rank in range(len(parts)):
+            key = ".".join(parts[rank:]).lower()
+            keys[key] = min(rank, keys.get(key, rank))
+    return keys
+
+
+def iter_sections(html):
+    """Yields dicts with anchor, heading, level, text and symbols ({key: rank})."""
+    soup = BeautifulSoup(html, "html.parser")
+    for heading in soup.find_all(list(HEADINGS) + ["dt"]):
+        if heading.name == "dt" and not heading.get("id"):
+            continue
+        anchor = heading.get("id") or ""
+        if not anchor:
+            link = heading.find("a", id=True)
+            anchor = link["id"] if link else ""
+        title = PERMALINK.sub("", heading.get_text(" ", strip=True)).strip()
+        symbols = section_symbols(anchor, title, " ".join(code.get_text() for code in heading.find_all("code")))
+        text = _section_text(heading)
+        if symbols and text:
+            yield {
+                "anchor": anchor,
+                "heading": title,
+                "level": HEADINGS.get(heading.name, 5),
+                "text": text,
+                "symbols": symbols,
+            }
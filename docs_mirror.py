@@ -0,0 +1,157 @@
+"""
+Snapshots each framework's documentation into a local corpus and builds the
+full-text index the doc tools answer from before going to the live site.
+Pages are listed from the site's sitemap (for Microsoft Learn, from the
+docset's table of contents) and fetched over plain HTTP.
+
+    python docs_mirror.py                                   # every framework
+    python docs_mirror.py --frameworks Pydantic --max-pages 300
+    python docs_mirror.py --index-only                      # rebuild from DB/docs/
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from DB.DocIndex import DocIndex
+from tools.fetcher import get_session
+
+CORPUS_DIR = os.getenv("DOCS_CORPUS_DIR", "DB/docs")
+
+# Framework names as the tools cache them -> sitemap (or toc.json), and the
+# path prefix pages must have to be mirrored. Microsoft Learn only publishes a
+# site-wide sitemap, so Semantic Kernel is listed from its docset's TOC.
+DOC_SOURCES = {
+    "Langchain": ("https://docs.langchain.com/sitemap.xml", "/oss/python/"),
+    "LangChainJS": ("https://js.langchain.com/sitemap.xml", "/docs/"),
+    "LangGraph": ("https://langchain-ai.github.io/langgraph/sitemap.xml", "/langgraph/"),
+    "LLamaIndex": ("https://docs.llamaindex.ai/en/stable/sitemap.xml", "/en/stable/"),
+    "CrewAI": ("https://docs.crewai.com/sitemap.xml", "/en/"),
+    "Pydantic": ("https://docs.pydantic.dev/latest/sitemap.xml", "/latest/"),
+    "Autogen": ("https://microsoft.github.io/autogen/stable/sitemap.xml", "/autogen/stable/"),
+    "SemanticKernel": ("https://learn.microsoft.com/en-us/semantic-kernel/toc.json", "/en-us/semantic-kernel/"),
+}
+
+# Where the documentation itself sits on a page, most specific first.
+CONTENT_SELECTORS = ["article", "main", "#main", ".bd-article", "[role='main']", "body"]
+
+LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>")
+
+
+def toc_urls(url, toc, prefix=None):
+    """Page URLs in a Microsoft Learn toc.json, in reading order."""
+    urls = []
+    stack = list(reversed(toc.get("items", [])))
+    while stack:
+        item = stack.pop()
+        if item.get("href"):
+            page = urldefrag(urljoin(url, item["href"]))[0]
+            if page not in urls and (prefix is None or urlparse(page).path.startswith(prefix)):
+                urls.append(page)
+        stack += reversed(item.get("children", []))
+    return urls
+
+
+def sitemap_urls(url, prefix=None, limit=None, depth=0):
+    """Page URLs listed by a sitemap (gzipped or not) or a toc.json, following sitemap indexes."""
+    response = get_session().get(url, timeout=30)
+    response.raise_for_status()
+    if urlparse(url).path.endswith("toc.json"):
+        urls = toc_urls(url, response.json(), prefix)
+        return urls[:limit] if limit else urls
+    content = response.content
+    if content[:2] == b"\x1f\x8b":  # .xml.gz, served without Content-Encoding
+        content = gzip.decompress(content)
+    urls = []
+    for loc in LOC.findall(content.decode("utf-8", errors="replace")):
+        if loc.endswith(".xml") or loc.endswith(".xml.gz"):
+            if depth < 2:
+                urls += sitemap_urls(loc, prefix, limit and limit - len(urls), depth + 1)
+        elif prefix is None or urlparse(loc).path.startswith(prefix):
+            urls.append(loc)
+        if limit and len(urls) >= limit:
+            break
+    return urls[:limit] if limit else urls
+
+
+def parse_page(url, html):
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(["script", "style", "nav", "header", "footer", "aside"]):
+        element.decompose()
+    content = next((soup.select_one(selector) for selector in CONTENT_SELECTORS if soup.select_one(selector)), soup)
+    title = soup.title.get_text(strip=True) if soup.title else url
+    return {"url": url, "title": title, "text": content.get_text("\n", strip=True), "html": str(content)}
+
+
+def fetch_page(url):
+    try:
+        response = get_session().get(url, timeout=30)
+    except Exception as e:
+        print(f"Failed to fetch {url}: {e}")
+        return None
+    if response.status_code != 200 or "html" not in response.headers.get("Content-Type", ""):
+        return None
+    return parse_page(url, response.text)
+
+
+def corpus_path(framework):
+    return os.path.join(CORPUS_DIR, f"{framework}.jsonl")
+
+
+def mirror(framework, sitemap, prefix=None, max_pages=None, workers=8):
+    """Fetches the framework's pages into its corpus file; returns the number of pages."""
+    urls = sitemap_urls(sitemap, prefix, max_pages)
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    count = 0
+    with ThreadPoolExecutor(workers) as pool, open(corpus_path(framework), "w", encoding="utf-8") as f:
+        for page in pool.map(fetch_page, urls):
+            if page and page["text"]:
+                f.write(json.dumps(page, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+def read_corpus(framework):
+    with open(corpus_path(framework), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_index(index, framework):
+    return index.build(framework, read_corpus(framework))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frameworks", nargs="+", default=list(DOC_SOURCES), choices=list(DOC_SOURCES))
+    parser.add_argument("--max-pages", type=int, default=None, help="Per framework.")
+    parser.add_argument("--sitemap", default=None, help="Override the sitemap or toc.json (with a single framework).")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--index-only", action="store_true", help="Rebuild the index from the existing corpus.")
+    parser.add_argument("--index", default=os.getenv("DOCS_INDEX_PATH", "DB/docs_index.sqlite3"))
+    args = parser.parse_args()
+    if args.sitemap and len(args.frameworks) != 1:
+        parser.error("--sitemap needs exactly one framework")
+
+    index = DocIndex(args.index)
+    for framework in args.frameworks:
+        start = time.perf_counter()
+        if not args.index_only:
+            sitemap, prefix = DOC_SOURCES[framework]
+            if args.sitemap:
+                sitemap, prefix = args.sitemap, None
+            pages = mirror(framework, sitemap, prefix, args.max_pages, args.workers)
+            print(f"{framework}: mirrored {pages} pages in {time.perf_counter() - start:.1f}s")
+        if not os.path.exists(corpus_path(framework)):
+            print(f"{framework}: no corpus at {corpus_path(framework)}")
+            continue
+        start = time.perf_counter()
+        indexed = build_index(index, framework)
+        print(f"{framework}: indexed {indexed} pages in {time.perf_counter() - start:.1f}s")
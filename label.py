@@ -1,5 +1,6 @@
 import json
 import re
+from functools import lru_cache
 from typing import Optional, Union
 from pydantic import BaseModel, ValidationError
 from langchain.chat_models import ChatOpenAI
@@ -19,6 +20,18 @@ class ClassificationResult(BaseModel):
     effect_rational: str
 
 
+# Classification fields copied into each result record.
+RECORD_FIELDS = [
+    "bug_type", "Language", "Component", "Framework", "root_cause", "effect",
+    "bug_type_rational", "root_cause_rational", "effect_rational",
+]
+
+
+def prediction_record(post_id, reasoning: str, prediction: dict) -> dict:
+    """Result record for a classified post; KeyError if the prediction is incomplete."""
+    return {"id": post_id, "reasoning": reasoning, **{field: prediction[field] for field in RECORD_FIELDS}}
+
+
 def try_parse_fuzzy_json(text: str) -> dict:
     try:
         return json.loads(text)
@@ -32,14 +45,13 @@ def try_parse_fuzzy_json(text: str) -> dict:
         return {"raw_response": text}
 
 
-def classify_post_and_answer(
-    post_text: str,
-    answer_text: str,
-    llm: Optional[Union[BaseChatModel, ChatOpenAI]] = None,
-    llm_type: str = "openai"
-) -> dict:
-    if llm is None:
-        raise ValueError("An instantiated LLM must be passed.")
+@lru_cache(maxsize=None)
+def _prompt_bundle(llm_type: str) -> tuple:
+    """
+    The system message and extra chat-call arguments (the function schema
+    for openai) shared by every post, built once per llm_type. They come
+    before the post in every request, so the provider can cache the prefix.
+    """
     rational_fields = {
         "bug_type_rational": "A sentence explaining why the selected bug_type was chosen.",
         "root_cause_rational": "A sentence explaining why the selected root_cause was chosen.",
@@ -174,23 +186,10 @@ Memory stores previous interactions or user preferences to maintain context, lik
             + ", ".join(classification_fields.keys()) + "\n\n" + definations +"\n\n Component of the LLM agent where the bug occured." + component_definitions 
             +"You also have to provide a rational, a single sentence explaining why you choosed the label, for each classification field in these keys: ["+ ", ".join(rational_fields.keys())+"]\n\n"
         ))
-        user_message = HumanMessage(content=f"<Post>{post_text}</Post>\n<Answer>{answer_text}</Answer>")
-        response = llm(
-            messages=[system_message, user_message],
-            functions=[function_schema],
-            function_call={"name": "classify_post_result"}
-        )
-        
-        func_call = response.additional_kwargs.get("function_call")
-        if func_call and "arguments" in func_call:
-            try:
-                parsed = json.loads(func_call["arguments"])
-                validated = ClassificationResult(**parsed)
-                return validated.dict()
-            except (json.JSONDecodeError, ValidationError) as e:
-                return {"error": str(e), "raw": func_call["arguments"]}
-        else:
-            return {"raw_response": response.content}
+        return system_message, {
+            "functions": [function_schema],
+            "function_call": {"name": "classify_post_result"},
+        }
 
     elif llm_type.lower() == "claude":
         prompt = (
@@ -202,18 +201,60 @@ Memory stores previous interactions or user preferences to maintain context, lik
             '"Framework": "Langchain", "root_cause": "Incorrect Instruction-Instruction Logic(II.IL)", "effect": "Incorrect Outpu (IO)" } \n\n'+ definations
 
         )
-        messages = [
-            SystemMessage(content=prompt),
-            HumanMessage(content=f"<Post>{post_text}</Post>\n<Answer>{answer_text}</Answer>")
-        ]
-        response = llm(messages=messages)
-        raw = try_parse_fuzzy_json(response.content)
+        # Claude only caches prompt prefixes that are marked for it.
+        system_message = SystemMessage(content=[
+            {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}
+        ])
+        return system_message, {}
+
+    else:
+        raise ValueError(f"Unsupported LLM type: {llm_type}")
 
+
+def classification_request(post_text: str, answer_text: str, llm_type: str = "openai") -> tuple:
+    """
+    Messages for classifying one post, and the extra chat-call arguments.
+    Shared by the per-post and batch paths.
+    """
+    system_message, kwargs = _prompt_bundle(llm_type.lower())
+    user_message = HumanMessage(content=f"<Post>{post_text}</Post>\n<Answer>{answer_text}</Answer>")
+    return [system_message, user_message], kwargs
+
+
+def parse_function_call(func_call: Optional[dict], content: str) -> dict:
+    """Classification from an openai function call, or the raw reply when the model did not call it."""
+    if func_call and "arguments" in func_call:
         try:
-            validated = ClassificationResult(**raw)
+            parsed = json.loads(func_call["arguments"])
+            validated = ClassificationResult(**parsed)
             return validated.dict()
-        except ValidationError as e:
-            return {"error": str(e), "raw_response": response.content}
-
+        except (json.JSONDecodeError, ValidationError) as e:
+            return {"error": str(e), "raw": func_call["arguments"]}
     else:
-        raise ValueError(f"Unsupported LLM type: {llm_type}")
+        return {"raw_response": content}
+
+
+def parse_json_reply(content: str) -> dict:
+    """Classification from a reply that should contain the JSON object (claude)."""
+    raw = try_parse_fuzzy_json(content)
+
+    try:
+        validated = ClassificationResult(**raw)
+        return validated.dict()
+    except ValidationError as e:
+        return {"error": str(e), "raw_response": content}
+
+
+def classify_post_and_answer(
+    post_text: str,
+    answer_text: str,
+    llm: Optional[Union[BaseChatModel, ChatOpenAI]] = None,
+    llm_type: str = "openai"
+) -> dict:
+    if llm is None:
+        raise ValueError("An instantiated LLM must be passed.")
+    messages, kwargs = classification_request(post_text, answer_text, llm_type)
+    response = llm(messages=messages, **kwargs)
+    if llm_type.lower() == "openai":
+        return parse_function_call(response.additional_kwargs.get("function_call"), response.content)
+    return parse_json_reply(response.content)
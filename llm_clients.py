@@ -0,0 +1,142 @@
+"""
+One LLM client per provider and base URL, shared by every thread. Each client
+keeps a pool of keep-alive connections, so TLS handshakes happen once per
+connection rather than once per call.
+
+    text = complete(prompt, model)
+    text = await acomplete(prompt, model)
+"""
+import asyncio
+import os
+import threading
+import weakref
+
+import anthropic
+import httpx
+import openai
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "32")),
+    max_keepalive_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "32")),
+    keepalive_expiry=60,
+)
+TIMEOUT = httpx.Timeout(float(os.getenv("LLM_TIMEOUT", "120")), connect=10)
+
+# New TCP connections opened by the clients of this process; see connection_stats().
+CONNECTION_STATS = {"requests": 0, "connections_opened": 0}
+
+_clients = {}
+# Async connections belong to the event loop that opened them, so async
+# clients are kept per loop and dropped once their loop has closed.
+_async_clients = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _count(name):
+    with _lock:
+        CONNECTION_STATS[name] += 1
+
+
+def _trace(event, info):
+    if event == "connection.connect_tcp.complete":
+        _count("connections_opened")
+
+
+async def _atrace(event, info):
+    _trace(event, info)
+
+
+def _on_request(request):
+    # httpcore reports connection setup through the "trace" extension.
+    _count("requests")
+    request.extensions["trace"] = _trace
+
+
+async def _aon_request(request):
+    _count("requests")
+    request.extensions["trace"] = _atrace
+
+
+def _http_client(asynchronous):
+    if asynchronous:
+        return httpx.AsyncClient(limits=LIMITS, timeout=TIMEOUT, event_hooks={"request": [_aon_request]})
+    return httpx.Client(limits=LIMITS, timeout=TIMEOUT, event_hooks={"request": [_on_request]})
+
+
+def provider_for(model):
+    if model.startswith("claude"):
+        return "anthropic"
+    if model.startswith("google"):
+        return "openrouter"
+    return "openai"
+
+
+def get_client(provider, asynchronous=False):
+    """The shared client for provider ("openai", "openrouter" or "anthropic")."""
+    if provider == "anthropic":
+        base_url = os.getenv("ANTHROPIC_BASE_URL")
+    elif provider == "openrouter":
+        base_url = os.getenv("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL)
+    else:
+        base_url = os.getenv("OPENAI_BASE_URL")
+    key = (provider, base_url)
+    with _lock:
+        if asynchronous:
+            for loop in [loop for loop in _async_clients if loop.is_closed()]:
+                del _async_clients[loop]
+            clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+        else:
+            clients = _clients
+        client = clients.get(key)
+        if client is None:
+            http_client = _http_client(asynchronous)
+            if provider == "anthropic":
+                cls = anthropic.AsyncAnthropic if asynchronous else anthropic.Anthropic
+                client = cls(api_key=os.getenv("CLAUDE_API_KEY"), base_url=base_url, http_client=http_client,
+                             max_retries=0)
+            else:
+                cls = openai.AsyncOpenAI if asynchronous else openai.OpenAI
+                api_key = os.getenv("OPENROUTER_API_KEY" if provider == "openrouter" else "OPENAI_API_KEY")
+                client = cls(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+            clients[key] = client
+        return client
+
+
+def _request(prompt, model):
+    provider = provider_for(model)
+    messages = [{"role": "user", "content": prompt}]
+    if provider == "anthropic":
+        return provider, dict(model=model, messages=messages, max_tokens=1000, temperature=0)
+    if provider == "openrouter":
+        return provider, dict(model=model, messages=messages)
+    return provider, dict(model=model, messages=messages, temperature=0)
+
+
+def _text(provider, response):
+    if provider == "anthropic":
+        return response.content[0].text
+    return response.choices[0].message.content.strip()
+
+
+def complete(prompt, model):
+    """Single-turn completion of prompt; raises on API errors. Retries are left to rate_limit."""
+    provider, kwargs = _request(prompt, model)
+    client = get_client(provider)
+    if provider == "anthropic":
+        return _text(provider, client.messages.create(**kwargs))
+    return _text(provider, client.chat.completions.create(**kwargs))
+
+
+async def acomplete(prompt, model):
+    provider, kwargs = _request(prompt, model)
+    client = get_client(provider, asynchronous=True)
+    if provider == "anthropic":
+        return _text(provider, await client.messages.create(**kwargs))
+    return _text(provider, await client.chat.completions.create(**kwargs))
+
+
+def connection_stats():
+    with _lock:
+        return dict(CONNECTION_STATS)
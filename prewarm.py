@@ -0,0 +1,251 @@
+"""
+Fills the tool cache ahead of an agent run. Likely lookups are mined from the
+bug datasets (imported names, class names and Class.method calls in the labels'
+rationale, commit code before the change, and the title and body of post CSVs
+given with --inputs) and run through the documentation tools in parallel,
+throttled to --rate lookups per minute. Keywords that are already cached are
+skipped.
+
+    python prewarm.py --inputs Dataset/SO.csv Dataset/Commit.csv --top-k 100
+    TOOL_CALL_LOG=tool_calls.jsonl python run_agent.py --input posts.csv
+    python prewarm.py --coverage tool_calls.jsonl   # how many lookups were prewarmed
+"""
+import argparse
+import builtins
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from batch_runner import run_batch
+from DB.MiniStore import get_store
+from rate_limit import ProviderLimiter
+from tools.fetcher import FETCH_STATS
+from tools.keywords import cache_key, doc_keyword, lookup_key, tool_calls_unlogged
+from tools.lookup import lookup_stats, similar_cached
+
+load_dotenv()
+
+TEXT_COLUMNS = ["title", "body", "Code Before Change", "Rational"]
+# The bug taxonomy; rationales name its labels in CamelCase (ArgumentBug).
+LABEL_COLUMNS = ["Bug Type", "Component", "Root Cause", "Effect"]
+
+# Framework column of the datasets -> the tool cache's framework name.
+DATASET_FRAMEWORKS = {
+    "langchain": "Langchain",
+    "langchain-js": "LangChainJS",
+    "langgraph": "LangGraph",
+    "llamaindex": "LLamaIndex",
+    "crewai": "CrewAI",
+    "autogen": "Autogen",
+    "pydantic": "Pydantic",
+    "semantic kernel": "SemanticKernel",
+}
+
+DOC_FRAMEWORKS = set(DATASET_FRAMEWORKS.values())
+
+# Module prefixes -> framework, so names imported from pydantic in a
+# LangChain post are looked up in the Pydantic docs.
+PY_MODULES = [
+    ("langgraph", "LangGraph"),
+    ("langchain", "Langchain"),
+    ("llama_index", "LLamaIndex"),
+    ("crewai", "CrewAI"),
+    ("autogen", "Autogen"),
+    ("pydantic", "Pydantic"),
+    ("semantic_kernel", "SemanticKernel"),
+]
+JS_MODULES = [
+    ("@langchain/langgraph", "LangGraph"),
+    ("@langchain/", "LangChainJS"),
+    ("langchain/", "LangChainJS"),
+]
+
+PY_IMPORT = re.compile(r"^\s*from\s+([\w.]+)\s+import\s+\(?([\w\s,]+)\)?", re.M)
+JS_IMPORT = re.compile(r"import\s*\{([^}]*)\}\s*from\s*[\"']([^\"']+)[\"']")
+CLASS_NAME = re.compile(r"\b[A-Z][a-z0-9]+(?:[A-Z][A-Za-z0-9]*)+\b")
+METHOD_CALL = re.compile(r"\b([A-Z][A-Za-z0-9]+)\.([a-z_][a-z0-9_]*)\(")
+
+# Names that look like API symbols but are not worth a documentation lookup:
+# Python builtins (exceptions included), product names, and exception and
+# warning classes (names ending in one of NOT_API_SUFFIXES).
+STOP = {name.lower() for name in dir(builtins)} | {
+    "langchain", "llamaindex", "crewai", "autogen", "langgraph", "semantickernel", "openai", "chatgpt",
+    "github", "javascript", "typescript", "stackoverflow", "pycharm", "vscode", "fastapi", "youtube",
+}
+NOT_API_SUFFIXES = ("Error", "Exception", "Warning", "NotFound")
+
+
+def module_framework(module, prefixes):
+    return next((framework for prefix, framework in prefixes if module.startswith(prefix)), None)
+
+
+def label_names(df):
+    """Taxonomy labels of a dataset, and each part of the hyphenated ones, as cache keys."""
+    names = set()
+    for column in LABEL_COLUMNS:
+        if column not in df.columns:
+            continue
+        for label in df[column].dropna().astype(str).unique():
+            label = re.sub(r"\s*\([^)]*\)", "", label)  # drop the "(AB)" abbreviation
+            names.add(cache_key(label))
+            names.update(cache_key(part) for part in label.split("-"))
+    return names
+
+
+def mine_keywords(text, framework, stop=STOP):
+    """(framework, keyword) pairs a text is likely to make the agent look up."""
+    found = []
+    for module, names in PY_IMPORT.findall(text):
+        target = module_framework(module, PY_MODULES) or framework
+        found += [(target, name.split(" as ")[0].strip()) for name in names.split(",") if name.strip()]
+    for names, module in JS_IMPORT.findall(text):
+        target = module_framework(module, JS_MODULES) or framework
+        found += [(target, name.split(" as ")[0].strip()) for name in names.split(",") if name.strip()]
+    if framework:
+        found += [(framework, f"{owner}.{method}") for owner, method in METHOD_CALL.findall(text)]
+        found += [(framework, name) for name in CLASS_NAME.findall(text)]
+    return [
+        (target, keyword) for target, keyword in found
+        if target and keyword and cache_key(doc_keyword(keyword)) not in stop
+        and not any(part.endswith(NOT_API_SUFFIXES) for part in keyword.split("."))
+    ]
+
+
+def mine_datasets(paths, top_k=None, min_count=1):
+    """Keywords per framework, most frequent first; counts are rows mentioning them."""
+    counts = defaultdict(Counter)
+    spelling = {}
+    for path in paths:
+        df = pd.read_csv(path)
+        stop = STOP | label_names(df)
+        columns = [column for column in TEXT_COLUMNS if column in df.columns]
+        for _, row in df.iterrows():
+            framework = DATASET_FRAMEWORKS.get(str(row.get("Framework", "")).strip().lower())
+            text = "\n".join(str(row[column]) for column in columns if pd.notna(row[column]))
+            for target, keyword in set(mine_keywords(text, framework, stop)):
+                key = (target, cache_key(doc_keyword(keyword)))
+                spelling.setdefault(key, doc_keyword(keyword))
+                counts[target][key[1]] += 1
+    mined = {}
+    for framework, counter in counts.items():
+        ranked = [(spelling[(framework, key)], n) for key, n in counter.most_common() if n >= min_count]
+        mined[framework] = ranked[:top_k] if top_k else ranked
+    return mined
+
+
+def doc_tools():
+    """Framework -> the documentation tool the agent calls for it."""
+    from tools.scrap_autogen import autogen_doc_search
+    from tools.scrap_crewai import crewai_doc_search
+    from tools.scrap_langchain import langchain_doc_search
+    from tools.scrap_langchain_js import langchain_js_doc_search
+    from tools.scrap_langgraph import langgraph_doc_search
+    from tools.scrap_llamaindex import llamaindex_doc_search
+    from tools.scrap_pydantic import pydantic_doc_search
+    from tools.scrap_semantic_kernel import semantic_kernel_doc_search
+    return {
+        "Langchain": langchain_doc_search,
+        "LangChainJS": langchain_js_doc_search,
+        "LangGraph": langgraph_doc_search,
+        "LLamaIndex": llamaindex_doc_search,
+        "CrewAI": crewai_doc_search,
+        "Autogen": autogen_doc_search,
+        "Pydantic": pydantic_doc_search,
+        "SemanticKernel": semantic_kernel_doc_search,
+    }
+
+
+def prewarm(mined, workers=4, rate=60):
+    """Runs the tool for every mined keyword not cached yet. Returns {"cached", "warmed", "empty", "failed"}."""
+    store = get_store()
+    tools = doc_tools()
+    todo = []
+    summary = Counter()
+    for framework, keywords in mined.items():
+        for keyword, _ in keywords:
+            if store.get(framework, cache_key(keyword)):
+                summary["cached"] += 1
+            else:
+                todo.append((framework, keyword))
+    print(f"Prewarming {len(todo)} lookups ({summary['cached']} already cached), "
+          f"{workers} workers, {rate} lookups/min")
+
+    limiter = ProviderLimiter(rate, 0)
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def warm(item):
+        framework, keyword = item
+        wait = limiter.reserve()
+        if wait:
+            time.sleep(wait)
+        # Prewarm lookups are not agent calls; keep them out of the replay log.
+        with tool_calls_unlogged():
+            return tools[framework].run(keyword)
+
+    def progress(item, result, failed):
+        outcome = "failed" if failed else ("empty" if result == "No results found" else "warmed")
+        with lock:
+            summary[outcome] += 1
+            done = summary["warmed"] + summary["empty"] + summary["failed"]
+        print(f"[{done}/{len(todo)}] {item[0]} {item[1]}: {outcome} ({time.perf_counter() - start:.0f}s)")
+
+    run_batch(todo, warm, max_workers=workers, key=lambda item: f"{item[0]}:{item[1]}",
+              on_error=lambda item, e: None, on_result=progress)
+    return dict(summary)
+
+
+def coverage(log_path, mined):
+    """Share of the doc-tool lookups in a TOOL_CALL_LOG that were mined, and that the cache can answer."""
+    store = get_store()
+    predicted = {(framework, cache_key(keyword)) for framework, keywords in mined.items() for keyword, _ in keywords}
+    with open(log_path, encoding="utf-8") as f:
+        calls = [json.loads(line) for line in f if line.strip()]
+    keys = [lookup_key(call["tool"], call["input"] or "") for call in calls if call["tool"] in DOC_FRAMEWORKS]
+    keys = [key for key in keys if key]
+    if not keys:
+        print(f"No documentation lookups in {log_path}")
+        return {}
+    exact = sum(bool(store.get(*key)) for key in keys)
+    similar = sum(not store.get(*key) and bool(similar_cached(store, *key)) for key in keys)
+    report = {
+        "lookups": len(keys),
+        "distinct": len(set(keys)),
+        "mined": sum(key in predicted for key in keys) / len(keys),
+        "cached_exact": exact / len(keys),
+        "cached_similar": similar / len(keys),
+    }
+    print(f"Coverage of {report['lookups']} logged lookups ({report['distinct']} distinct): "
+          f"{report['mined']:.1%} were mined, {report['cached_exact']:.1%} are cached, "
+          f"{report['cached_similar']:.1%} more via a similar keyword")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inputs", nargs="+", default=["Dataset/SO.csv", "Dataset/Commit.csv"],
+                        help="CSVs to mine; whichever of the title, body, Code Before Change and Rational columns they have are read.")
+    parser.add_argument("--top-k", type=int, default=None, help="Keywords per framework, most frequent first.")
+    parser.add_argument("--min-count", type=int, default=1, help="Rows a keyword must appear in.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=int, default=60, help="Tool lookups per minute.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the mined keywords.")
+    parser.add_argument("--coverage", default=None, help="TOOL_CALL_LOG of a later run to report coverage for.")
+    args = parser.parse_args()
+
+    mined = mine_datasets(args.inputs, args.top_k, args.min_count)
+    for framework, keywords in sorted(mined.items()):
+        print(f"{framework}: {len(keywords)} keywords, e.g. {', '.join(k for k, _ in keywords[:8])}")
+
+    if args.coverage:
+        coverage(args.coverage, mined)
+    elif not args.dry_run:
+        summary = prewarm(mined, args.workers, args.rate)
+        print(f"Prewarm: {summary}")
+        print(f"Tool lookups: {lookup_stats()}")
+        print(f"Tool page sources: {FETCH_STATS}")
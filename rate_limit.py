@@ -0,0 +1,234 @@
+"""
+Shared request scheduling for LLM providers. Every call to a provider takes
+a slot from that provider's limiter, a pair of token buckets for requests and
+tokens per minute, and is retried with exponential backoff and full jitter
+when it fails for a transient reason. A 429 pauses all callers of the
+provider for Retry-After and halves its request rate; the rate then climbs
+back with each success.
+
+    text = call_with_retries(lambda: client.create(...), "openai", tokens=1200)
+"""
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+
+import anthropic
+import httpx
+import openai
+
+# Requests and tokens per minute are only limited when LLM_RPM_<PROVIDER> or
+# LLM_TPM_<PROVIDER> is set (0 means no limit). Retry-After pauses apply either
+# way; halving the request rate after a 429 needs an LLM_RPM_ limit.
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+RATE_LIMIT_STATS = {"retries": 0, "rate_limited": 0, "throttled_seconds": 0.0}
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Refills at per_minute units per minute, up to ten seconds' worth.
+    reserve() always debits and returns how long the caller must wait for its
+    share, so a request larger than the bucket waits instead of starving.
+    """
+
+    def __init__(self, per_minute):
+        self.set_rate(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = self.rate * 10
+
+    def reserve(self, amount):
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class ProviderLimiter:
+    def __init__(self, rpm, tpm):
+        self.max_rpm = rpm
+        self.rpm = rpm
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=0):
+        """Seconds to wait before sending a request of about `tokens` tokens."""
+        with self._lock:
+            wait = max(self.requests.reserve(1), self.tokens.reserve(tokens),
+                       self.paused_until - time.monotonic())
+        return max(0.0, wait)
+
+    def on_success(self):
+        with self._lock:
+            if 0 < self.rpm < self.max_rpm:
+                self.rpm = min(self.max_rpm, self.rpm + max(1, self.max_rpm // 20))
+                self.requests.set_rate(self.rpm)
+
+    def on_rate_limited(self, pause):
+        with self._lock:
+            now = time.monotonic()
+            # Requests sent together tend to be refused together: slow down
+            # once per pause, not once per refused request.
+            if self.rpm > 0 and now >= self.paused_until:
+                self.rpm = max(1, self.rpm // 2)
+                self.requests.set_rate(self.rpm)
+            self.paused_until = max(self.paused_until, now + pause)
+
+
+def get_limiter(provider):
+    with _lock:
+        if provider not in _limiters:
+            rpm = int(os.getenv(f"LLM_RPM_{provider.upper()}", "0"))
+            tpm = int(os.getenv(f"LLM_TPM_{provider.upper()}", "0"))
+            _limiters[provider] = ProviderLimiter(rpm, tpm)
+        return _limiters[provider]
+
+
+def _count(name, amount=1):
+    with _lock:
+        RATE_LIMIT_STATS[name] += amount
+
+
+def retry_after(error):
+    """Seconds asked for by the Retry-After(-Ms) header of a failed response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(error):
+    # 529 is Anthropic's "overloaded".
+    return getattr(error, "status_code", None) in (429, 529)
+
+
+def is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return isinstance(error, (openai.APIConnectionError, anthropic.APIConnectionError, httpx.TransportError))
+
+
+def backoff(attempt):
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _after_failure(error, attempt, limiter):
+    """Delay before the next attempt."""
+    delay = retry_after(error)
+    if delay is None:
+        delay = backoff(attempt)
+    if is_rate_limited(error):
+        _count("rate_limited")
+        limiter.on_rate_limited(delay)
+    _count("retries")
+    return delay
+
+
+def call_with_retries(fn, provider, tokens=0, retries=None):
+    """fn(), throttled by the provider's limiter and retried on transient errors; the last error is raised."""
+    retries = MAX_RETRIES if retries is None else retries
+    limiter = get_limiter(provider)
+    attempt = 0
+    while True:
+        wait = limiter.reserve(tokens)
+        if wait:
+            _count("throttled_seconds", wait)
+            time.sleep(wait)
+        try:
+            result = fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            time.sleep(_after_failure(e, attempt, limiter))
+            attempt += 1
+            continue
+        limiter.on_success()
+        return result
+
+
+async def acall_with_retries(fn, provider, tokens=0, retries=None):
+    """call_with_retries for a coroutine function."""
+    retries = MAX_RETRIES if retries is None else retries
+    limiter = get_limiter(provider)
+    attempt = 0
+    while True:
+        wait = limiter.reserve(tokens)
+        if wait:
+            _count("throttled_seconds", wait)
+            await asyncio.sleep(wait)
+        try:
+            result = await fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            await asyncio.sleep(_after_failure(e, attempt, limiter))
+            attempt += 1
+            continue
+        limiter.on_success()
+        return result
+
+
+def _message_tokens(messages):
+    # About 4 characters per token; the exact count is not known before the call.
+    return sum(len(str(message.content)) for message in messages) // 4 + 1
+
+
+def shared_retries(model_class, provider):
+    """
+    Subclass of a LangChain chat model class whose calls take a slot from
+    the provider's limiter and are retried by call_with_retries, so a 429
+    seen by the agent pauses and slows every caller of the provider. Create
+    it with max_retries=0, or the SDK retries 429s on its own first.
+
+        llm = shared_retries(ChatOpenAI, "openai")(model_name=..., max_retries=0)
+    """
+
+    class SharedRetries(model_class):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            return call_with_retries(
+                lambda: super(SharedRetries, self)._generate(messages, stop, run_manager, **kwargs),
+                provider, tokens=_message_tokens(messages),
+            )
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            return await acall_with_retries(
+                lambda: super(SharedRetries, self)._agenerate(messages, stop, run_manager, **kwargs),
+                provider, tokens=_message_tokens(messages),
+            )
+
+    return SharedRetries
+
+
+def rate_limit_stats():
+    with _lock:
+        stats = dict(RATE_LIMIT_STATS)
+        stats["rpm"] = {provider: limiter.rpm for provider, limiter in _limiters.items()}
+    stats["throttled_seconds"] = round(stats["throttled_seconds"], 2)
+    return stats
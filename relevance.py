@@ -0,0 +1,71 @@
+import os
+import re
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Chunks that do not mention the target are ranked by TF-IDF similarity to it;
+# at most RELEVANCE_TOP_K of those scoring RELEVANCE_MIN_SCORE or more are sent
+# to the LLM. RELEVANCE_FILTER=0 sends every chunk.
+RELEVANCE_FILTER = os.getenv("RELEVANCE_FILTER", "1") != "0"
+RELEVANCE_TOP_K = int(os.getenv("RELEVANCE_TOP_K", "3"))
+RELEVANCE_MIN_SCORE = float(os.getenv("RELEVANCE_MIN_SCORE", "0.05"))
+
+SYMBOL = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def symbol_tokens(text):
+    """
+    Identifiers as a whole plus their parts, lowercased:
+    "ChatOpenAI.model_dump_json" -> chatopenai.model_dump_json, chatopenai,
+    chat, open, ai, model_dump_json, model, dump, json.
+    """
+    tokens = []
+    for symbol in SYMBOL.findall(text):
+        tokens.append(symbol.lower())
+        for part in symbol.split("."):
+            if "." in symbol:
+                tokens.append(part.lower())
+            words = [w.lower() for piece in part.split("_") for w in CAMEL.findall(piece)]
+            if len(words) > 1:
+                tokens += words
+    return [token for token in tokens if len(token) > 1]
+
+
+def mentions_target(chunk, target):
+    """True if the chunk contains the target, or the last component of a dotted target."""
+    target = target.strip().casefold()
+    if not target:
+        return False
+    chunk = chunk.casefold()
+    return target in chunk or target.rsplit(".", 1)[-1] in chunk
+
+
+def rank_chunks(chunks, target):
+    """TF-IDF cosine similarity of each chunk to the target."""
+    if not chunks:
+        return np.zeros(0)
+    try:
+        vectorizer = TfidfVectorizer(analyzer=symbol_tokens, sublinear_tf=True)
+        matrix = vectorizer.fit_transform(chunks)
+    except ValueError:  # no identifiers in any chunk
+        return np.zeros(len(chunks))
+    query = vectorizer.transform([target])
+    return (matrix @ query.T).toarray().ravel()
+
+
+def select_chunks(chunks, target, top_k=None, min_score=None, always_one=True):
+    """
+    Indexes, best first, of the chunks worth sending: at most top_k scoring
+    min_score or more. With always_one the best chunk is returned even if
+    nothing scores, e.g. for a discussion that never names the target.
+    """
+    top_k = RELEVANCE_TOP_K if top_k is None else top_k
+    min_score = RELEVANCE_MIN_SCORE if min_score is None else min_score
+    scores = rank_chunks(chunks, target)
+    order = [int(i) for i in np.argsort(-scores, kind="stable")]
+    selected = [i for i in order if scores[i] >= min_score][:top_k]
+    if not selected and always_one and order:
+        selected = order[:1]
+    return selected
@@ -0,0 +1,54 @@
+import json
+import os
+import threading
+
+
+class JsonlSink:
+    """
+    Append-only JSONL file of per-post results, keyed by post ID.
+    Each record is flushed as soon as it is written, so a crashed run keeps
+    everything finished before the crash. Post IDs are compared as strings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._repair_tail()
+
+    def _repair_tail(self):
+        # Terminate a half-written last line so the next record starts cleanly.
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def records(self):
+        """Latest record per post ID, in first-seen order."""
+        latest = {}
+        if not os.path.exists(self.path):
+            return latest
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line.
+                    continue
+                latest[str(record["id"])] = record
+        return latest
+
+    def completed_ids(self, statuses=("ok",)):
+        return {post_id for post_id, record in self.records().items() if record.get("status") in statuses}
+
+    def write(self, record, status="ok"):
+        line = json.dumps({**record, "status": status}, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
@@ -1,11 +1,19 @@
 import os
 from dotenv import load_dotenv
-from label import classify_post_and_answer
-import traceback
+from label import classify_post_and_answer, prediction_record
+from batch_label import classify_reasoned
+from batch_runner import run_batch, run_pipeline, set_max_in_flight
+from result_sink import JsonlSink
+from DB.MiniStore import get_store
+from tools.lookup import lookup_stats
+from tools.fetcher import FETCH_STATS
+from chunking import extraction_stats
+from llm_clients import connection_stats
+from rate_limit import rate_limit_stats, shared_retries
+import argparse
 import json
 import re
 from langchain.callbacks import get_openai_callback
-import time
 load_dotenv() 
 
 from langchain.chat_models import ChatOpenAI
@@ -37,27 +45,30 @@ if not claude_api_key and not openai_api_key and not openrouter_api_key:
 if claude_api_key:
     print("Using Claude model")
     model_name = "claude-sonnet-4-20250514"
-    llm = ChatAnthropic(
+    llm = shared_retries(ChatAnthropic, "anthropic")(
         anthropic_api_key=claude_api_key,
         model_name=model_name,
         temperature=1,
+        max_retries=0,
     )
 elif openrouter_api_key:
     print("Using Gemini model")
     model_name = "google/gemini-2.5-flash"
-    llm = ChatOpenAI(
+    llm = shared_retries(ChatOpenAI, "openrouter")(
         base_url="https://openrouter.ai/api/v1",
         openai_api_key=openrouter_api_key,
         model_name=model_name,
         temperature=1,
+        max_retries=0,
     )
 else:
     print("Using OpenAI model")
     model_name = "o3-mini-2025-01-31" # "gpt-5-2025-08-07" #
-    llm = ChatOpenAI(
+    llm = shared_retries(ChatOpenAI, "openai")(
         openai_api_key=openai_api_key,
         model_name=model_name,
         temperature=1,
+        max_retries=0,
     )
     agent_type = AgentType.OPENAI_FUNCTIONS 
 
@@ -164,61 +175,108 @@ def run_agent_with_post(post_text: str):
 
 
 
-if __name__ == "__main__":
-    df = pd.read_csv("file_name.csv")
-    data = []
-    for _, row in df.iloc[:].iterrows():
-        title = row['title']
-        
-        body =  row['body']
-        
-        
-        example_post = f"""
+def build_post_prompt(title, body):
+    return f"""
         You are an expert in finding bugs. You are given Stack Overflow post. Your task is to indentify where the problem is. You have access to tools that will search the documentation or discussion pages for you. You should use them linstead of assuming an you are correct. 
         Title: {title} \n\n
         Body: {body} \n\n
         """
-        try:
-            result = run_agent_with_post(example_post)
-            
-            prediction = classify_post_and_answer(example_post, result,llm,"claude" if claude_api_key else "openai") #
-            if(openrouter_api_key):
-                cleaned = re.sub(r"^```json|```$", "", prediction["raw_response"].strip(), flags=re.MULTILINE).strip()
-                prediction = json.loads(cleaned)
-            data.append({
-                "id": id,
-                "reasoning": result,
-                "bug_type": prediction['bug_type'],
-                "Language": prediction['Language'],
-                "Component": prediction['Component'],
-                "Framework": prediction['Framework'],
-                "root_cause": prediction['root_cause'],
-                "effect": prediction['effect'],
-                "bug_type_rational": prediction['bug_type_rational'],
-                "root_cause_rational": prediction['root_cause_rational'],
-                "effect_rational": prediction['effect_rational'],
-                
-            })
-            
-        except Exception as e:
-            print(f"Error processing post ID {id}: {e}")
-            traceback.print_exc()
-            end_time = time.perf_counter()
-            
-            data.append({
-                "id": id,
-                "reasoning": "Error occurred",
-                "bug_type": "N/A",
-                "Language": "N/A",
-                "Component": "N/A",
-                "Framework": "N/A",
-                "root_cause": "N/A",
-                "effect": "N/A",
-                "bug_type_rational": "N/A",
-                "root_cause_rational": "N/A",
-                "effect_rational": "N/A",
-                
-            })
+
+
+def reason_post(post):
+    example_post = build_post_prompt(post['title'], post['body'])
+    return {"id": post['id'], "post": example_post, "reasoning": run_agent_with_post(example_post)}
+
+
+def classify_post(reasoned):
+    prediction = classify_post_and_answer(reasoned['post'], reasoned['reasoning'], llm, "claude" if claude_api_key else "openai") #
+    if(openrouter_api_key):
+        cleaned = re.sub(r"^```json|```$", "", prediction["raw_response"].strip(), flags=re.MULTILINE).strip()
+        prediction = json.loads(cleaned)
+    return prediction_record(reasoned['id'], reasoned['reasoning'], prediction)
+
+
+def process_post(post):
+    return classify_post(reason_post(post))
+
+
+def failed_post(post, error):
+    return {
+        "id": post['id'],
+        "reasoning": "Error occurred",
+        "bug_type": "N/A",
+        "Language": "N/A",
+        "Component": "N/A",
+        "Framework": "N/A",
+        "root_cause": "N/A",
+        "effect": "N/A",
+        "bug_type_rational": "N/A",
+        "root_cause_rational": "N/A",
+        "effect_rational": "N/A",
         
+    }
 
-   
\ No newline at end of file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default="file_name.csv")
+    parser.add_argument("--workers", type=int, default=4, help="Posts the agent reasons about concurrently.")
+    parser.add_argument("--classify-workers", type=int, default=2,
+                        help="Posts classified concurrently while the agent works on the next ones.")
+    parser.add_argument("--queue-size", type=int, default=8,
+                        help="Reasoned posts allowed to wait for classification before the agent pauses.")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Global cap on posts in progress.")
+    parser.add_argument("--output", default="results.jsonl", help="Append-only JSONL file results are streamed to.")
+    parser.add_argument("--resume", action="store_true", help="Skip post IDs already completed in --output.")
+    parser.add_argument("--classify", choices=["sync", "batch", "skip"], default="sync",
+                        help="Classify each post right away, afterwards through the provider's batch API, "
+                             "or not at all (run batch_label.py later).")
+    args = parser.parse_args()
+    if args.classify == "batch" and (claude_api_key or openrouter_api_key):
+        raise SystemExit("--classify batch needs the OpenAI model (unset CLAUDE_API_KEY and OPENROUTER_API_KEY).")
+    if args.max_in_flight:
+        set_max_in_flight(args.max_in_flight)
+
+    df = pd.read_csv(args.input)
+    missing = [column for column in ("title", "body") if column not in df.columns]
+    if missing:
+        raise SystemExit(f"{args.input} has no {' or '.join(missing)} column. The input needs one row per post "
+                         f"with title and body columns (and optionally ID); the Dataset/ CSVs hold the labels only.")
+    posts = [
+        {"id": row.get('ID', index), "title": row['title'], "body": row['body']}
+        for index, row in df.iterrows()
+    ]
+    sink = JsonlSink(args.output)
+    classify_now = args.classify == "sync"
+    if args.resume:
+        done = sink.completed_ids() if classify_now else sink.completed_ids(("ok", "reasoned"))
+        posts = [post for post in posts if str(post['id']) not in done]
+        print(f"Resuming: {len(done)} posts already completed, {len(posts)} remaining")
+
+    if classify_now:
+        # Classification of one post overlaps with reasoning about the next.
+        data, stats = run_pipeline(
+            posts,
+            [("reason", reason_post, args.workers), ("classify", classify_post, args.classify_workers)],
+            queue_size=args.queue_size,
+            key=lambda post: post['id'],
+            on_error=failed_post,
+            on_result=lambda post, record, failed: sink.write(record, status="error" if failed else "ok"),
+        )
+    else:
+        data, stats = run_batch(
+            posts,
+            reason_post,
+            max_workers=args.workers,
+            key=lambda post: post['id'],
+            on_error=failed_post,
+            on_result=lambda post, record, failed: sink.write(record, status="error" if failed else "reasoned"),
+        )
+    if args.classify == "batch":
+        classify_reasoned(sink, model_name)
+    print(f"Tool cache: {get_store().cache_stats()}")
+    print(f"Tool lookups: {lookup_stats()}")
+    print(f"Tool page sources: {FETCH_STATS}")
+    print(f"Chunk extraction: {extraction_stats()}")
+    print(f"Extraction LLM connections: {connection_stats()}")
+    print(f"LLM rate limiting: {rate_limit_stats()}")
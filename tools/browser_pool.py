@@ -0,0 +1,181 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+
+def make_chrome_driver():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--window-size=1920,1080")
+    return webdriver.Chrome(options=options)
+
+
+class BrowserPool:
+    """
+    Bounded pool of headless Chrome sessions shared by the scraping tools.
+    Sessions are health-checked before being handed out, reset to a blank page
+    when returned, replaced after max_uses borrows and closed after sitting
+    idle for idle_timeout seconds.
+    """
+
+    def __init__(self, max_size=2, max_uses=50, idle_timeout=300, make_driver=make_chrome_driver):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.make_driver = make_driver
+        self._idle = deque()  # (driver, uses, last_used)
+        self._uses = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._reaper = None
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._start_reaper()
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    driver, uses, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    driver, uses = None, 0
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No browser session became available")
+                self._cond.wait(remaining)
+
+        if driver is not None and not self._healthy(driver):
+            self._quit(driver)
+            driver, uses = None, 0
+        if driver is None:
+            try:
+                driver = self.make_driver()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        self._uses[id(driver)] = uses + 1
+        return driver
+
+    def release(self, driver, broken=False):
+        uses = self._uses.pop(id(driver), self.max_uses)
+        if not broken and uses < self.max_uses and not self._closed:
+            broken = not self._recycle(driver)
+        else:
+            broken = True
+        if broken:
+            self._quit(driver)
+        with self._cond:
+            if broken or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((driver, uses, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except BaseException:
+            broken = not self._healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def evict_idle(self):
+        now = time.monotonic()
+        with self._cond:
+            stale = [entry for entry in self._idle if now - entry[2] >= self.idle_timeout]
+            for entry in stale:
+                self._idle.remove(entry)
+            self._size -= len(stale)
+            self._cond.notify_all()
+        for driver, _, _ in stale:
+            self._quit(driver)
+        return len(stale)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for driver, _, _ in idle:
+            self._quit(driver)
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+
+        def reap():
+            while not self._closed:
+                time.sleep(max(self.idle_timeout / 2, 1))
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=reap, name="browser-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    @staticmethod
+    def _healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _recycle(driver):
+        # Drop cookies and the current page so the next borrower starts clean.
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                max_size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+                max_uses=int(os.getenv("BROWSER_MAX_USES", "50")),
+                idle_timeout=float(os.getenv("BROWSER_IDLE_TIMEOUT", "300")),
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+
+def browser_session(timeout=None):
+    """A pooled session; waits at most BROWSER_ACQUIRE_TIMEOUT seconds (default 30) for one to free up."""
+    if timeout is None:
+        timeout = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "30"))
+    return get_pool().session(timeout)
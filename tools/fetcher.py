@@ -0,0 +1,102 @@
+import os
+import threading
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# How many lookups were answered with an exact section or pages from the local
+# docs index, over plain HTTP, and how many fell back to Chrome.
+FETCH_STATS = {"section": 0, "index": 0, "http": 0, "browser": 0}
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+
+
+def http_enabled():
+    return os.getenv("HTTP_FETCH", "1") != "0"
+
+
+def get_session():
+    """Process-wide requests session with a keep-alive connection pool."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(HEADERS)
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def count_fetch(kind):
+    with _stats_lock:
+        FETCH_STATS[kind] += 1
+
+
+def fetch_json(url, timeout=10):
+    """Decoded JSON body, or None when the request fails."""
+    if not http_enabled():
+        return None
+    try:
+        response = get_session().get(url, timeout=timeout, headers={"Accept": "application/json"})
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def fetch_soup(url, timeout=10):
+    """Parsed HTML, or None when the request fails or is not HTML."""
+    if not http_enabled():
+        return None
+    try:
+        response = get_session().get(url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200 or "html" not in response.headers.get("Content-Type", ""):
+        return None
+    return BeautifulSoup(response.text, "html.parser")
+
+
+def fetch_text(url, timeout=10):
+    """Body of a plain-text or Markdown response, or None when the request fails or returns HTML."""
+    if not http_enabled():
+        return None
+    try:
+        response = get_session().get(url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200 or "html" in response.headers.get("Content-Type", ""):
+        return None
+    return response.text.strip() or None
+
+
+def html_text(html):
+    return BeautifulSoup(html, "html.parser").get_text("\n", strip=True)
+
+
+def http_text(url, selector, timeout=10):
+    """
+    Text of the first element matching the CSS selector in the static HTML.
+    None means the page needs JS to render it (or could not be fetched).
+    """
+    soup = fetch_soup(url, timeout)
+    if soup is None:
+        return None
+    element = soup.select_one(selector)
+    if element is None:
+        return None
+    text = element.get_text("\n", strip=True)
+    return text or None
+
@@ -0,0 +1,138 @@
+"""
+One canonical form for what the agent passes to the search tools, used for
+both the query sent to the site and the cache key, so spellings of the same
+thing share one cache entry.
+
+    doc_keyword("langchain.chat_models.ChatOpenAI(model='gpt-4o')")  -> "ChatOpenAI"
+    cache_key("ChatOpenAI") == cache_key("chat_openai")              -> "chatopenai"
+    parse_github_input("model_dump_json_pydantic")                   -> ("model_dump_json", "pydantic")
+"""
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+
+# Names the agent uses for renamed or deprecated symbols -> the current name.
+ALIASES = {
+    "gptvectorstoreindex": "VectorStoreIndex",
+    "gptsimplevectorindex": "VectorStoreIndex",
+    "gptlistindex": "SummaryIndex",
+    "listindex": "SummaryIndex",
+}
+
+# GitHub library names as the agent writes them -> the keys scrap_github knows.
+LIBRARY_ALIASES = {
+    "pyautogen": "autogen",
+    "ag2": "autogen",
+    "crew": "crewai",
+    "llama": "llamaindex",
+    "sk": "semantickernel",
+    "lcjs": "langchainjs",
+}
+
+QUOTES = "\"'`“”‘’"
+IMPORT = re.compile(r"^(?:from\s+\S+\s+)?import\s+(\S+)")
+SEPARATORS = re.compile(r"[\s_\-]+")
+
+_log_lock = threading.Lock()
+
+
+def normalize(text):
+    """NFKC, surrounding quotes and whitespace stripped, inner whitespace collapsed."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(text.strip().strip(QUOTES).split())
+
+
+def doc_keyword(text):
+    """
+    The API symbol to look up in documentation: the first word, or the
+    imported name of an import statement, without call arguments and without
+    a leading module path (pydantic.BaseModel.model_dump -> BaseModel.model_dump).
+    """
+    text = normalize(text)
+    match = IMPORT.match(text)
+    keyword = match.group(1) if match else (text.split(" ")[0] if text else "")
+    keyword = keyword.split("(", 1)[0].strip(".,:;@" + QUOTES)
+    parts = keyword.split(".")
+    if len(parts) > 1:
+        first_class = next((i for i, part in enumerate(parts) if part[:1].isupper()), None)
+        parts = parts[first_class:] if first_class is not None else parts[-1:]
+    keyword = ".".join(parts)
+    return ALIASES.get(keyword.casefold(), keyword)
+
+
+def search_query(text):
+    """Free-text query for the discussion forums."""
+    return normalize(text)
+
+
+def cache_key(query):
+    """Case, separators and whitespace do not distinguish cache entries."""
+    return SEPARATORS.sub("", query.casefold())
+
+
+def library_name(name):
+    name = re.sub(r"[\s_\-.]+", "", normalize(name).casefold())
+    return LIBRARY_ALIASES.get(name, name)
+
+
+def parse_github_input(arg, libraries=()):
+    """
+    (keyword, library) from "keyword_libraryName". The library is the longest
+    underscore-separated suffix naming one of libraries (so llama_index
+    works), else what follows the last underscore, since keywords such as
+    model_dump_json contain underscores of their own. None when the input
+    has no keyword or no library.
+    """
+    arg = normalize(arg)
+    splits = [i for i, c in enumerate(arg) if c == "_"]
+    if not splits:
+        return None
+    known = [i for i in splits if library_name(arg[i + 1:]) in libraries]
+    i = known[0] if known else splits[-1]
+    keyword, library = arg[:i], arg[i + 1:]
+    if not keyword.strip() or not library.strip():
+        return None
+    return search_query(keyword), library_name(library)
+
+
+def lookup_key(tool, raw_input, libraries=()):
+    """
+    (framework, cache key) a tool call with raw_input is cached under, None
+    when the tool rejects it. tool is the name log_tool_call records.
+    """
+    if tool == "GitHub":
+        parsed = parse_github_input(raw_input, libraries)
+        if parsed is None or parsed[1] not in libraries:
+            return None
+        return f"GitHub_{parsed[1]}", cache_key(parsed[0])
+    query = search_query(raw_input) if tool == "OpenAI" else doc_keyword(raw_input)
+    return (tool, cache_key(query)) if query else None
+
+
+# Cleared by tool_calls_unlogged(), e.g. for prewarm lookups, which are not agent calls.
+_log_calls = contextvars.ContextVar("log_tool_calls", default=True)
+
+
+@contextmanager
+def tool_calls_unlogged():
+    """Tool calls made inside the block, in this context only, are not written to TOOL_CALL_LOG."""
+    token = _log_calls.set(False)
+    try:
+        yield
+    finally:
+        _log_calls.reset(token)
+
+
+def log_tool_call(tool, raw_input):
+    """Appends the raw tool input to TOOL_CALL_LOG (JSONL), when set, for replay."""
+    path = os.getenv("TOOL_CALL_LOG")
+    if not path or not _log_calls.get():
+        return
+    line = json.dumps({"tool": tool, "input": raw_input, "ts": time.time()}, ensure_ascii=False)
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
@@ -0,0 +1,54 @@
+import os
+
+from chunking import approx_tokens, extract_info_about_target
+from DB.DocIndex import get_doc_index
+from relevance import mentions_target
+from tools.fetcher import count_fetch
+
+DOCS_INDEX_TOP_K = int(os.getenv("DOCS_INDEX_TOP_K", "2"))
+# Sections up to this size are returned as they are; longer ones go through
+# the extraction LLM like a page would.
+SECTION_MAX_TOKENS = int(os.getenv("SECTION_MAX_TOKENS", "1500"))
+
+
+def local_doc_section(framework, keyword):
+    """Text of the section(s) documenting keyword as an API symbol, or None."""
+    index = get_doc_index()
+    if index is None or not keyword:
+        return None
+    sections = index.sections(framework, keyword)
+    if not sections:
+        return None
+    return "\n\n".join(f"{s['heading']}\n{s['url']}#{s['anchor']}\n{s['text']}" for s in sections)
+
+
+def local_doc_text(framework, keyword):
+    """
+    Text of the mirrored pages (see docs_mirror.py) that best match keyword,
+    or None when there is no index or no page actually mentions it, in which
+    case the caller searches the live site.
+    """
+    index = get_doc_index()
+    if index is None or not keyword:
+        return None
+    hits = [hit for hit in index.search(framework, keyword, DOCS_INDEX_TOP_K) if mentions_target(hit["text"], keyword)]
+    if not hits:
+        return None
+    return "\n\n".join(f"{hit['title']}\n{hit['url']}\n{hit['text']}" for hit in hits)
+
+
+def local_docs_answer(framework, keyword):
+    """
+    Tool result from the local docs index: the exact section for a known
+    symbol without an LLM call, otherwise what the extraction LLM finds in
+    the best matching pages. None when the live site has to be searched.
+    """
+    section = local_doc_section(framework, keyword)
+    if section and approx_tokens(section) <= SECTION_MAX_TOKENS:
+        count_fetch("section")
+        return section
+    page_text = section or local_doc_text(framework, keyword)
+    if not page_text:
+        return None
+    count_fetch("index")
+    return extract_info_about_target(page_text, keyword)
@@ -0,0 +1,99 @@
+import threading
+import traceback
+
+from DB.KeywordIndex import get_keyword_index
+from DB.MiniStore import get_store
+from DB.SingleFlight import SingleFlight
+from tools.keywords import cache_key, doc_keyword
+
+# Counters for the tool lookups of this process; see lookup_stats().
+LOOKUP_STATS = {"cache_hits": 0, "similar_hits": 0, "fetches": 0, "waited_on_other_process": 0}
+
+_flight = SingleFlight()
+_stats_lock = threading.Lock()
+
+
+class NoResults(Exception):
+    """Raised by a fetch to return its message to the agent without caching it."""
+
+
+def _count(name):
+    with _stats_lock:
+        LOOKUP_STATS[name] += 1
+
+
+def similar_cached(db, framework, keyword):
+    """Cached text of a near-duplicate keyword (ChatOpenAI for chat_openai), or None."""
+    index = get_keyword_index(db)
+    match = index.nearest(framework, keyword) if index is not None else None
+    if match is None:
+        return None
+    cached_result = db.get(framework, match[0])
+    if cached_result:
+        print(f"Serving {framework} lookup for {keyword!r} from {match[0]!r} (similarity {match[1]:.2f})")
+    return cached_result
+
+
+def cached_lookup(framework, keyword, fetch):
+    """
+    Returns the cached text for (framework, keyword), or for a near-duplicate
+    cached keyword, or runs fetch() to produce it and caches the result.
+    Concurrent identical lookups, in this process or in others sharing the
+    cache backend, run fetch() only once.
+    """
+    db = get_store()
+    cached_result = db.get(framework, keyword)
+    if cached_result:
+        _count("cache_hits")
+        return cached_result
+    cached_result = similar_cached(db, framework, keyword)
+    if cached_result:
+        _count("similar_hits")
+        return cached_result
+
+    def fetch_once():
+        # The lock spans processes: whoever waited on it re-reads the cache
+        # before scraping, since the holder has usually just filled it.
+        with db.lock(framework, keyword):
+            cached_result = db.get(framework, keyword)
+            if cached_result:
+                _count("waited_on_other_process")
+                return cached_result
+            _count("fetches")
+            results_text = fetch()
+            db.save(framework, keyword, results_text)
+            index = get_keyword_index(db)
+            if index is not None:
+                index.add(framework, keyword)
+            return results_text
+
+    try:
+        return _flight.do((framework, keyword.strip().casefold()), fetch_once)
+    except NoResults as e:
+        return str(e)
+    except Exception:
+        traceback.print_exc()
+        return "No results found"
+
+
+def lookup_keyword(framework, raw_keyword, fetch, canonicalize=doc_keyword):
+    """
+    cached_lookup for what the agent passed to a tool: canonicalize() gives
+    the query fetch(query) searches for, cache_key(query) the cache entry.
+    """
+    query = canonicalize(raw_keyword)
+    if not query:
+        return "No results found"
+    return cached_lookup(framework, cache_key(query), lambda: fetch(query))
+
+
+def lookup_stats():
+    """
+    fetches counts scrape+extract runs. coalesced (waited on a fetch in this
+    process) plus waited_on_other_process are the duplicate fetches avoided.
+    """
+    with _stats_lock:
+        stats = dict(LOOKUP_STATS)
+    stats["coalesced"] = _flight.coalesced
+    stats["duplicates_avoided"] = stats["coalesced"] + stats["waited_on_other_process"]
+    return stats
@@ -1,78 +1,79 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import platform
-import time
-import traceback
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.lookup import lookup_keyword
+from tools.keywords import log_tool_call
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, page_ready
 from chunking import extract_info_about_target
+from tools.fetcher import count_fetch, fetch_text
+from tools.site_search import llms_search, markdown_url
+from tools.local_docs import local_docs_answer
 from langchain.tools import tool
 
 
+def search_without_browser(keyword):
+    """
+    The docs are a Mintlify site: llms.txt lists every page and each page is
+    also served as Markdown. Returns None when that does not find one.
+    """
+    url = llms_search("https://docs.crewai.com/", keyword, prefix="/en/")
+    return fetch_text(markdown_url(url)) if url else None
+
+
 @tool
 def crewai_doc_search(keyword: str) -> str:
     """
     Searches Crewai docs for the keyword and returns the text. 
     """
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(options=options)
-    
-    if keyword is not None:
-        keyword = keyword.split(" ")[0].strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) 
-            
-    agent_keyword = "CrewAI"
-    db = MiniStore()
-    if db.exists(agent_keyword, keyword):
-        cached_result = db.get(agent_keyword, keyword)
-        if cached_result:
-            return cached_result
-            
-    try:
+    log_tool_call("CrewAI", keyword)
+    return lookup_keyword("CrewAI", keyword, _scrape)
+
+
+def _scrape(keyword):
+    answer = local_docs_answer("CrewAI", keyword)
+    if answer is not None:
+        return answer
+
+    page_text = search_without_browser(keyword)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword)
+
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("CrewAI") as budget:
         driver.get("https://docs.crewai.com/en/introduction/")
-            
+        
 
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(1)
+        body = budget.wait(driver, EC.presence_of_element_located((By.TAG_NAME, "body")), "page load")
+        budget.wait(driver, page_ready, "page ready")
 
-        body = driver.find_element(By.TAG_NAME, "body")
         if platform.system() == "Darwin":
             body.send_keys(Keys.COMMAND + "k")
         else:
             body.send_keys(Keys.CONTROL + "k")
-        time.sleep(2)
-        
+    
         # Type search query
-        input_element = WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located((By.XPATH, "/html/body/div[4]/div/div/div/div[2]/div/div[1]/input"))
+        input_element = budget.wait(
+            driver,
+            EC.visibility_of_element_located((By.XPATH, "/html/body/div[4]/div/div/div/div[2]/div/div[1]/input")),
+            "search box",
         )
         print("input element found")
 
         input_element.click()        
         input_element.clear()  # Optional: clear any existing text
         input_element.send_keys(keyword)
-        time.sleep(1)
+        # Enter only opens a hit once the result list has been rendered.
+        budget.wait(driver, EC.presence_of_element_located((By.CSS_SELECTOR, "[role='option']")), "search results", timeout=5, optional=True)
+        search_url = driver.current_url
         input_element.send_keys(Keys.ENTER)
-        
-        time.sleep(1)
 
-        body_element = WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located((By.TAG_NAME, "body"))
-        )
-        time.sleep(1)
+        budget.wait(driver, EC.url_changes(search_url), "open result", timeout=5, optional=True)
+        budget.wait(driver, page_ready, "result ready")
+        body_element = budget.wait(driver, EC.visibility_of_element_located((By.TAG_NAME, "body")), "result body")
 
         results_text = body_element.text
-        results_text = extract_info_about_target(results_text, keyword)
-        db.save(agent_keyword, keyword, results_text)
-        return results_text
-    
 
-    except Exception as e:
-        traceback.print_exc()
-        return f"No results found"
+    return extract_info_about_target(results_text, keyword)
@@ -1,16 +1,25 @@
 from langchain.tools import tool
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import platform
-import time
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.lookup import NoResults, lookup_keyword
+from tools.keywords import library_name as canonical_library, log_tool_call, parse_github_input, search_query
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, text_present
 from chunking import extract_info_about_target
-import traceback
+from urllib.parse import quote, urljoin
+from tools.fetcher import count_fetch, fetch_soup, http_text
+
+DISCUSSION_SELECTOR = ".discussion.js-discussion.js-socket-channel.js-updatable-content"
+DISCUSSION_URLS = {"langchain":"https://github.com/langchain-ai/langchain/discussions",
+                   "langgraph":"https://github.com/langchain-ai/langgraph/discussions",
+                   "autogen":"https://github.com/microsoft/autogen/discussions",
+                   "crewai":"https://github.com/crewAIInc/crewAI/discussions" ,
+                   "langchainjs":"https://github.com/langchain-ai/langchainjs/discussions",
+                   "llamaindex":"https://github.com/run-llama/llama_index/discussions",
+                   "pydantic":"https://github.com/pydantic/pydantic/discussions",
+                   "semantickernel":"https://github.com/microsoft/semantic-kernel/discussions"
+                   }
 
 
 @tool
@@ -18,94 +27,80 @@ def github_discussion_search(arg: str) -> str: #wrapper function for the tool, s
     """
     Searches github discussion for the query and returns the text.
     """
-    parts = [s.strip() for s in arg.split("_")]
-    if len(parts) != 2 or not all(parts):
-        return "Invalid input to github_discussion_search. Please provide exactly one underscore-separated string in the format keyword_libraryName."
+    log_tool_call("GitHub", arg)
+    parsed = parse_github_input(arg, DISCUSSION_URLS)
+    if parsed is None:
+        return "Invalid input to github_discussion_search. Please provide a string in the format keyword_libraryName."
         
-    keyword, library_name = parts
+    keyword, library_name = parsed
     return github_search(keyword, library_name)
 
 
+def search_without_browser(keyword, base_url):
+    """
+    GitHub renders discussion search and discussion pages on the server, so
+    both can be read from plain HTML. Returns None when that does not work.
+    """
+    soup = fetch_soup(f"{base_url}?discussions_q={quote(keyword)}")
+    if soup is None:
+        return None
+    link = soup.select_one(".lh-condensed.pl-2.pr-3.flex-1 a")
+    if link is None or not link.get("href"):
+        return None
+    return http_text(urljoin(base_url, link["href"]), DISCUSSION_SELECTOR)
+
+
 def github_search(keyword: str, library_name:str) -> str:
     
-    library_name = library_name.strip().lower()
-    library_name = unicodedata.normalize("NFKC", library_name)
+    library_name = canonical_library(library_name)
     
-    url_map = {"langchain":"https://github.com/langchain-ai/langchain/discussions",
-               "langgraph":"https://github.com/langchain-ai/langgraph/discussions",
-               "autogen":"https://github.com/microsoft/autogen/discussions",
-               "crewai":"https://github.com/crewAIInc/crewAI/discussions" ,
-               "langchainjs":"https://github.com/langchain-ai/langchainjs/discussions",
-               "llamaindex":"https://github.com/run-llama/llama_index/discussions",
-               "pydantic":"https://github.com/pydantic/pydantic/discussions",
-               "semantickernel":"https://github.com/microsoft/semantic-kernel/discussions"
-               }
-    if library_name not in url_map.keys():
-        return f"Library '{library_name}' not supported. Supported libraries: {', '.join(url_map.keys())}"
+    if library_name not in DISCUSSION_URLS.keys():
+        return f"Library '{library_name}' not supported. Supported libraries: {', '.join(DISCUSSION_URLS.keys())}"
     
-    if keyword is not None:
-        keyword = keyword.strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) 
-            
     agent_keyword = "GitHub_"+library_name
-    db = MiniStore()
-    if db.exists(agent_keyword, keyword):
-        cached_result = db.get(agent_keyword, keyword)
-        if cached_result:
-            return cached_result
-        
-    options = Options()
-    options.add_argument("--headless")
-    
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
+    return lookup_keyword(agent_keyword, keyword, lambda query: _scrape(query, DISCUSSION_URLS[library_name]),
+                          canonicalize=search_query)
 
-    driver = webdriver.Chrome(options=options)
-    try:
-        
-        base_url = url_map[library_name]    
-        driver.get(base_url)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
 
-        search_input = driver.find_element(By.ID, "discussions-search-combobox")
+def _scrape(keyword, base_url):
+    page_text = search_without_browser(keyword, base_url)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword, relevance_filter=False)
+
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("GitHub") as budget:
+        driver.get(base_url)
+        search_input = budget.wait(driver, EC.element_to_be_clickable((By.ID, "discussions-search-combobox")), "search box")
         search_input.clear()
 
         search_input.send_keys(keyword + Keys.RETURN)
 
-        time.sleep(2)
-        results = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "lh-condensed"))
+        # The landing page already lists discussions, so wait for the search
+        # to navigate before collecting results.
+        budget.wait(driver, EC.url_contains("discussions_q"), "search submit", timeout=5, optional=True)
+        results = budget.wait(
+            driver,
+            EC.presence_of_all_elements_located((By.CLASS_NAME, "lh-condensed")),
+            "search results",
         )
 
         # Filter for elements that have all expected classes
         matching_elements = [el for el in results if "pl-2" in el.get_attribute("class") and "pr-3" in el.get_attribute("class") and "flex-1" in el.get_attribute("class")]
-       
-        # Click the first one
-        if matching_elements:
-            first = matching_elements[0]
-            
-            link = first.find_element(By.TAG_NAME, "a")
-            url  = link.get_attribute("href")
-            driver.get(url)
-            time.sleep(2)
-            discussion_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((
-                By.CSS_SELECTOR, 
-                ".discussion.js-discussion.js-socket-channel.js-updatable-content"
-            ))
-            )
-            results_text = discussion_element.text
-            results_text = extract_info_about_target(results_text, keyword)
-            db.save(agent_keyword, keyword, results_text)
-            return results_text
-            
-        else:
-            return "No matching elements found."
-         
+   
+        if not matching_elements:
+            raise NoResults("No matching elements found.")
 
-    except Exception as e:
-        return f"Error during LangChain doc search: {str(e)}"
-    finally:
-        driver.quit()
+        # Click the first one
+        first = matching_elements[0]
+        link = first.find_element(By.TAG_NAME, "a")
+        url  = link.get_attribute("href")
+        driver.get(url)
+        discussion_element = budget.wait(
+            driver,
+            text_present((By.CSS_SELECTOR, DISCUSSION_SELECTOR)),
+            "discussion",
+        )
+        results_text = discussion_element.text
 
+    return extract_info_about_target(results_text, keyword, relevance_filter=False)
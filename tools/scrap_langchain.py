@@ -1,16 +1,25 @@
 from langchain.tools import tool
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import platform
-import time
 from chunking import extract_info_about_target
-import traceback
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.fetcher import count_fetch, fetch_text
+from tools.site_search import llms_search, markdown_url
+from tools.local_docs import local_docs_answer
+from tools.lookup import lookup_keyword
+from tools.keywords import log_tool_call
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, page_ready
+
+
+def search_without_browser(keyword):
+    """
+    The docs are a Mintlify site: llms.txt lists every page and each page is
+    also served as Markdown. Returns None when that does not find one.
+    """
+    url = llms_search("https://docs.langchain.com/", keyword, prefix="/oss/python/")
+    return fetch_text(markdown_url(url)) if url else None
 
 
 @tool
@@ -18,57 +27,45 @@ def langchain_doc_search(keyword: str) -> str:
     """
     Searches LangChain docs for the keyword and returns the text. 
     """
+    log_tool_call("Langchain", keyword)
+    return lookup_keyword("Langchain", keyword, _scrape)
 
-    if keyword is not None:
-        keyword = keyword.split(" ")[0].strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) # Normalize and strip whitespace. Sometimes different LLM generates texts in different format.
-       
 
-    db = MiniStore()
-    if db.exists("Langchain", keyword):
-        cached_result = db.get("Langchain", keyword)
-        if cached_result:
-            return cached_result
+def _scrape(keyword):
+    answer = local_docs_answer("Langchain", keyword)
+    if answer is not None:
+        return answer
 
-    options = Options()
-    options.add_argument("--headless")
-    
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
+    page_text = search_without_browser(keyword)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword)
 
-    driver = webdriver.Chrome(options=options)
-    try:
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("Langchain") as budget:
         driver.get("https://docs.langchain.com/")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
+        body = budget.wait(driver, EC.presence_of_element_located((By.TAG_NAME, "body")), "page load")
+        budget.wait(driver, page_ready, "page ready")
 
-        body = driver.find_element(By.TAG_NAME, "body")
         if platform.system() == "Darwin":
             body.send_keys(Keys.COMMAND + "k")
         else:
             body.send_keys(Keys.CONTROL + "k")
 
-        search_box = WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located((By.ID, "search-input"))
+        search_box = budget.wait(
+            driver,
+            EC.visibility_of_element_located((By.ID, "search-input")),
+            "search box",
         )
         search_box.send_keys(keyword)
-        time.sleep(1)
+        # Enter only opens a hit once the result list has been rendered.
+        budget.wait(driver, EC.presence_of_element_located((By.CSS_SELECTOR, "[role='option']")), "search results", timeout=5, optional=True)
+        search_url = driver.current_url
         search_box.send_keys(Keys.ENTER)
 
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        time.sleep(1)
-
+        budget.wait(driver, EC.url_changes(search_url), "open result", timeout=5, optional=True)
+        budget.wait(driver, page_ready, "result ready")
         results = driver.find_element(By.TAG_NAME, "body")
         results_text = results.text
-        results_text = extract_info_about_target(results_text, keyword)
-        db.save("Langchain", keyword, results_text)
-        return results_text
-
-    except Exception as e:
-        traceback.print_exc()
-        return f"No results found"
-    finally:
-        driver.quit()
 
+    return extract_info_about_target(results_text, keyword)
@@ -1,17 +1,24 @@
 from langchain.tools import tool
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import platform
-import traceback
-import time
-import traceback
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.lookup import lookup_keyword
+from tools.keywords import log_tool_call
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, page_ready
 from chunking import extract_info_about_target
+from tools.fetcher import count_fetch, http_text
+from tools.site_search import mkdocs_search
+from tools.local_docs import local_docs_answer
+
+
+def search_without_browser(keyword):
+    """
+    The docs are static MkDocs pages; their search index names the page.
+    Returns None when that does not find one.
+    """
+    url = mkdocs_search("https://langchain-ai.github.io/langgraph/", keyword)
+    return http_text(url, "article") if url else None
 
 
 @tool
@@ -19,59 +26,49 @@ def langgraph_doc_search(keyword: str) -> str:
     """
     Searches Langgraph docs for the query and returns the text.
     """
+    log_tool_call("LangGraph", keyword)
+    return lookup_keyword("LangGraph", keyword, _scrape)
 
-    if keyword is not None:
-        keyword = keyword.split(" ")[0].strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) 
-            
-    agent_keyword = "LangGraph"
-    db = MiniStore()
-    if db.exists(agent_keyword, keyword):
-        cached_result = db.get(agent_keyword, keyword)
-        if cached_result:
-            return cached_result
-        
 
-    options = Options()
-    options.add_argument("--headless")
-    
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
+def _scrape(keyword):
+    answer = local_docs_answer("LangGraph", keyword)
+    if answer is not None:
+        return answer
+
+    page_text = search_without_browser(keyword)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword)
 
-    driver = webdriver.Chrome(options=options)
-    try:
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("LangGraph") as budget:
         driver.get("https://langchain-ai.github.io/langgraph/")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
 
-        search_trigger = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CLASS_NAME, "md-search__inner"))
+        search_trigger = budget.wait(
+            driver,
+            EC.element_to_be_clickable((By.CLASS_NAME, "md-search__inner")),
+            "search trigger",
         )
         search_trigger.click()
-        
+    
 
         # Focus and type into the actual input box
-        search_input = WebDriverWait(driver, 4).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "md-search__input"))
+        search_input = budget.wait(
+            driver,
+            EC.presence_of_element_located((By.CLASS_NAME, "md-search__input")),
+            "search box",
+            timeout=4,
         )
         search_input.send_keys(keyword)
-        time.sleep(2)
+        # Material for MkDocs only follows Enter once a result is listed.
+        budget.wait(driver, EC.presence_of_element_located((By.CLASS_NAME, "md-search-result__item")), "search results", timeout=5, optional=True)
+        search_url = driver.current_url
         search_input.send_keys(Keys.ENTER)
-        time.sleep(1)
+        budget.wait(driver, EC.url_changes(search_url), "open result", timeout=5, optional=True)
+        budget.wait(driver, page_ready, "result ready")
 
-        
+    
 
         results_text = driver.find_element(By.TAG_NAME, "body").text
-        
-        results_text = extract_info_about_target(results_text, keyword)
-        db.save(agent_keyword, keyword, results_text)
-        return results_text
-
-
-
-    except Exception as e:
-        traceback.print_exc()
-        return f"No results found"
-    finally:
-        driver.quit()
 
+    return extract_info_about_target(results_text, keyword)
@@ -1,73 +1,72 @@
 from langchain.tools import tool
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import platform
-import time
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.lookup import NoResults, lookup_keyword
+from tools.keywords import log_tool_call, search_query
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, text_present
 from chunking import extract_info_about_target
-import traceback
+from urllib.parse import quote
+from tools.fetcher import count_fetch, fetch_json, html_text
+
+COMMUNITY_URL = "https://community.openai.com"
+
+
+def search_without_browser(keyword):
+    """
+    Discourse serves search results and topics as JSON, so the first topic can
+    be read without a browser. Returns None when the JSON path does not work.
+    """
+    results = fetch_json(f"{COMMUNITY_URL}/search.json?q={quote(keyword)}")
+    if not results or not results.get("posts"):
+        return None
+    topic = fetch_json(f"{COMMUNITY_URL}/t/{results['posts'][0]['topic_id']}.json")
+    if not topic:
+        return None
+    posts = topic.get("post_stream", {}).get("posts", [])
+    text = "\n\n".join(f"{post['username']}\n{html_text(post['cooked'])}" for post in posts)
+    return text or None
 
 @tool
 def openai_search(keyword: str) -> str:
     """
     Searches openai OpenAI Developer Community for the query and returns the text.
     """
-    if keyword is not None:
-        keyword = keyword.strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) 
-            
-    agent_keyword = "OpenAI"
-    db = MiniStore()
-    if db.exists(agent_keyword, keyword):
-        cached_result = db.get(agent_keyword, keyword)
-        if cached_result:
-            return cached_result
+    log_tool_call("OpenAI", keyword)
+    return lookup_keyword("OpenAI", keyword, _scrape, canonicalize=search_query)
+
 
-    options = Options()
-    options.add_argument("--headless")
-    
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
+def _scrape(keyword):
+    page_text = search_without_browser(keyword)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword, relevance_filter=False)
 
-    driver = webdriver.Chrome(options=options)
-    try:
-        driver.get(f"https://community.openai.com/search?q={keyword}")
-        # WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("OpenAI") as budget:
+        driver.get(f"{COMMUNITY_URL}/search?q={keyword}")
         # search_input = driver.find_element(By.ID, "ember23")
         # search_input.clear()
         # search_input.send_keys(keyword + Keys.RETURN)
-        # time.sleep(2)
 
-        question_container = driver.find_element(By.CLASS_NAME, "fps-result-entries")
+        question_container = budget.wait(
+            driver,
+            EC.presence_of_element_located((By.CLASS_NAME, "fps-result-entries")),
+            "search results",
+        )
 
         list_items = question_container.find_elements(By.CSS_SELECTOR, 'div[role="listitem"]')
-        
-        if list_items:
-            anchor = list_items[0].find_element(By.CLASS_NAME, "search-link")
-            # Get the href attribute
-            link_url = anchor.get_attribute("href")
-            
-            # Navigate to the URL
-            driver.get(link_url)
-            time.sleep(2)
+        if not list_items:
+            raise NoResults("No results found for the query.")
+
+        anchor = list_items[0].find_element(By.CLASS_NAME, "search-link")
+        # Get the href attribute
+        link_url = anchor.get_attribute("href")
+
+        # Navigate to the URL
+        driver.get(link_url)
 
-            result = driver.find_element(By.CLASS_NAME, "container.posts")
-            results_text = result.text
-            results_text = extract_info_about_target(results_text, keyword)
-            db.save(agent_keyword, keyword, results_text)
-            return results_text
-        
-        else:
-            return "No results found for the query."
+        result = budget.wait(driver, text_present((By.CSS_SELECTOR, ".container.posts")), "topic posts")
+        results_text = result.text
 
-    except Exception as e:
-        traceback.print_exc()
-        return f"No results found"
-    finally:
-        driver.quit()
+    return extract_info_about_target(results_text, keyword, relevance_filter=False)
@@ -1,17 +1,32 @@
 from langchain.tools import tool
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import platform
-import traceback
-import time
 from urllib.parse import urlparse
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.lookup import lookup_keyword
+from tools.keywords import log_tool_call
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, page_ready
 from chunking import extract_info_about_target
+from doc_sections import iter_sections
+from tools.fetcher import count_fetch, fetch_soup
+from tools.site_search import mkdocs_search
+from tools.local_docs import local_docs_answer
+
+
+def search_without_browser(keyword):
+    """
+    The docs are static MkDocs pages; their search index names the page and
+    section. Returns that section, as the browser path does, or the whole
+    article when the hit has no anchor. None when that does not work.
+    """
+    url = mkdocs_search("https://docs.pydantic.dev/latest/", keyword)
+    soup = fetch_soup(url) if url else None
+    article = soup.select_one("article") if soup else None
+    if article is None:
+        return None
+    fragment = urlparse(url).fragment
+    section = next((s for s in iter_sections(str(article)) if fragment and s["anchor"] == fragment), None)
+    return (section["text"] if section else article.get_text("\n", strip=True)) or None
 
 
 @tool
@@ -19,66 +34,61 @@ def pydantic_doc_search(keyword: str) -> str:
     """
     Searches pydantic docs for the query and returns the text.
     """
-    if keyword is not None:
-        keyword = keyword.split(" ")[0].strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) 
-            
-    agent_keyword = "Pydantic"
-    db = MiniStore()
-    if db.exists(agent_keyword, keyword):
-        cached_result = db.get(agent_keyword, keyword)
-        if cached_result:
-            return cached_result
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
-
-    driver = webdriver.Chrome(options=options)
-    try:
+    log_tool_call("Pydantic", keyword)
+    return lookup_keyword("Pydantic", keyword, _scrape)
+
+
+def _scrape(keyword):
+    answer = local_docs_answer("Pydantic", keyword)
+    if answer is not None:
+        return answer
+
+    page_text = search_without_browser(keyword)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword)
+
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("Pydantic") as budget:
         driver.get("https://docs.pydantic.dev/")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
 
         # Click the search input
-        search_trigger = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CLASS_NAME, "md-search__inner"))
+        search_trigger = budget.wait(
+            driver,
+            EC.element_to_be_clickable((By.CLASS_NAME, "md-search__inner")),
+            "search trigger",
         )
         search_trigger.click()
 
         # Type the query
-        search_input = WebDriverWait(driver, 4).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "md-search__input"))
+        search_input = budget.wait(
+            driver,
+            EC.presence_of_element_located((By.CLASS_NAME, "md-search__input")),
+            "search box",
+            timeout=4,
         )
         search_input.send_keys(keyword)
-        time.sleep(2)
-        
+    
 
-        # Wait for the results list to appear
-        results_list = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "ol.ais-Hits-list.md-search-result__list"))
+        # Wait for the first hit to be listed
+        first_result = budget.wait(
+            driver,
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "ol.ais-Hits-list.md-search-result__list li.ais-Hits-item.md-search-result__item a")),
+            "search results",
         )
 
-        # Find the first result and click it
-        first_result = results_list.find_element(By.CSS_SELECTOR, "li.ais-Hits-item.md-search-result__item a")
+        # Click it and wait for the new page to load
+        search_url = driver.current_url
         first_result.click()
-
-        # Wait for the new page content to load
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
-
-        # Get the body text
-        results_text = driver.find_element(By.TAG_NAME, "body").text
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
+        budget.wait(driver, EC.url_changes(search_url), "open result")
+        budget.wait(driver, page_ready, "result ready")
 
         # 1. grab the current URL and pull off the fragment (the part after '#')
         current_url = driver.current_url
         fragment = urlparse(current_url).fragment
 
         # 2. find the <h2> whose id matches that fragment
-        header = driver.find_element(By.CSS_SELECTOR, f"h2#{fragment}")
+        header = budget.wait(driver, EC.presence_of_element_located((By.CSS_SELECTOR, f"h2#{fragment}")), "section header")
 
         # 3. now walk its siblings, collecting text until you hit the next <h2>
         section_texts = []
@@ -98,14 +108,5 @@ def pydantic_doc_search(keyword: str) -> str:
         # join everything
         results_text = "\n".join(section_texts)
 
-        
-        results_text = extract_info_about_target(results_text, keyword)
-        db.save(agent_keyword, keyword, results_text)
-        return results_text
-
-    except Exception as e:
-        traceback.print_exc()
-        return f"No results found"
-    finally:
-        driver.quit()
 
+    return extract_info_about_target(results_text, keyword)
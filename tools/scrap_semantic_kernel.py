@@ -1,50 +1,59 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import platform
-import time
-from DB.MiniStore import MiniStore
-import unicodedata
+from tools.lookup import lookup_keyword
+from tools.keywords import log_tool_call
+from tools.browser_pool import browser_session
+from tools.waits import LatencyBudget, text_present
 from chunking import extract_info_about_target
 from langchain.tools import tool
-import traceback
+from urllib.parse import quote
+from tools.fetcher import count_fetch, fetch_json, http_text
+from tools.local_docs import local_docs_answer
+
+
+def search_without_browser(keyword):
+    """
+    Microsoft Learn exposes its site search as a JSON API and serves articles as
+    static HTML. Returns None when that path does not work.
+    """
+    results = fetch_json(f"https://learn.microsoft.com/api/search?search={quote(keyword)}&locale=en-us&$top=1")
+    if not results or not results.get("results"):
+        return None
+    return http_text(results["results"][0]["url"], "#main")
 
 @tool
 def semantic_kernel_doc_search(keyword): 
     """
     Searches semantic kernel docs for the query and returns the text.
     """
-    if keyword is not None:
-        keyword = keyword.split(" ")[0].strip()
-        keyword =  unicodedata.normalize("NFKC", keyword) 
-            
-    agent_keyword = "SemanticKernel"
-    db = MiniStore()
-    if db.exists(agent_keyword, keyword):
-        cached_result = db.get(agent_keyword, keyword)
-        if cached_result:
-            return cached_result
+    log_tool_call("SemanticKernel", keyword)
+    return lookup_keyword("SemanticKernel", keyword, _scrape)
+
+
+def _scrape(keyword):
+    answer = local_docs_answer("SemanticKernel", keyword)
+    if answer is not None:
+        return answer
 
-    options = Options()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(options=options)
+    page_text = search_without_browser(keyword)
+    if page_text:
+        count_fetch("http")
+        return extract_info_about_target(page_text, keyword)
 
-    try:
+    count_fetch("browser")
+    with browser_session() as driver, LatencyBudget("SemanticKernel") as budget:
         driver.get("https://learn.microsoft.com/en-us/search/")
-        time.sleep(2)  # Wait for the page to load
         selector = ".autocomplete-input.input.input-lg.control.has-icons-left.width-full"
-        search_input = driver.find_element(By.CSS_SELECTOR, selector)
+        search_input = budget.wait(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, selector)), "search box")
         search_input.send_keys(keyword)
 
         search_input.send_keys(Keys.ENTER)
-        
-        time.sleep(2)  # Wait for the search results to load
-        results = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[data-bi-name="result"]'))
+    
+        results = budget.wait(
+            driver,
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[data-bi-name="result"]')),
+            "search results",
         )
 
         # take the first result, find its <a> tag, grab the href, and navigate there
@@ -52,17 +61,8 @@ def semantic_kernel_doc_search(keyword):
         link = first_result.find_element(By.TAG_NAME, "a")
         url = link.get_attribute("href")
         driver.get(url)
-                
-        time.sleep(1)  # Wait for the results to load
 
-        results_text = driver.find_element(By.ID, "main").text
+        results_text = budget.wait(driver, text_present((By.ID, "main")), "article").text
 
-        results_text = extract_info_about_target(results_text, keyword)
-        db.save(agent_keyword, keyword, results_text)
-        return results_text
-        
 
-    except Exception as e:
-        traceback.print_exc()
-        return f"No results found"
-        
+    return extract_info_about_target(results_text, keyword)
@@ -0,0 +1,114 @@
+"""
+Finds the documentation page for a keyword from the static search indexes
+the site generators publish next to the pages, so the doc tools can skip
+the site's JS search box and read the page over plain HTTP:
+
+    MkDocs (LangGraph, LlamaIndex, Pydantic)   search/search_index.json
+    Sphinx (AutoGen)                           searchindex.js
+    Mintlify (LangChain, CrewAI)               llms.txt
+
+Each index is downloaded once per process. Every function returns None when
+the index cannot be read or nothing in it mentions the keyword, in which case
+the tool falls back to the browser.
+"""
+import json
+import re
+import threading
+from urllib.parse import urljoin, urlparse
+
+import numpy as np
+
+from relevance import mentions_target, rank_chunks
+from tools.fetcher import fetch_json, fetch_text
+
+# Large sites publish indexes of several MB.
+INDEX_TIMEOUT = 30
+LLMS_LINK = re.compile(r"^\s*-\s*\[([^\]]+)\]\(([^)\s]+)\)(?::\s*(.*))?$", re.M)
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _load(url, parse):
+    """(url, title, text) entries of the index at url, or None; only successful loads are kept."""
+    with _lock:
+        if url not in _indexes:
+            entries = parse(url)
+            if not entries:
+                return None
+            _indexes[url] = entries
+        return _indexes[url]
+
+
+def best_match(entries, keyword):
+    """
+    URL of the entry best matching keyword: among the entries mentioning it,
+    those whose title names it first, then by TF-IDF similarity.
+    """
+    hits = [entry for entry in entries if mentions_target(f"{entry[1]}\n{entry[2]}", keyword)]
+    if not hits:
+        return None
+    hits = [entry for entry in hits if mentions_target(entry[1], keyword)] or hits
+    scores = rank_chunks([f"{title}\n{text}" for _, title, text in hits], keyword)
+    return hits[int(np.argmax(scores))][0]
+
+
+def _mkdocs_entries(url):
+    index = fetch_json(url, timeout=INDEX_TIMEOUT)
+    if not index:
+        return None
+    base = urljoin(url, "..")  # the index sits in <site>/search/
+    return [(urljoin(base, doc["location"]), doc.get("title", ""), doc.get("text", ""))
+            for doc in index.get("docs", []) if doc.get("location")]
+
+
+def _sphinx_entries(url):
+    script = fetch_text(url, timeout=INDEX_TIMEOUT)
+    if not script or "(" not in script:
+        return None
+    try:
+        index = json.loads(script[script.index("(") + 1:script.rindex(")")])
+    except ValueError:
+        return None
+    pages = [urljoin(url, f"{name}.html") for name in index.get("docnames", [])]
+    entries = [(page, title, title) for page, title in zip(pages, index.get("titles", []))]
+    for prefix, objects in index.get("objects", {}).items():
+        # [doc, objtype, priority, anchor, name] rows; older Sphinx maps name -> row.
+        rows = objects.items() if isinstance(objects, dict) else [(row[4], row) for row in objects]
+        for name, row in rows:
+            symbol = f"{prefix}.{name}" if prefix else name
+            entries.append((pages[row[0]], symbol, symbol))
+    return entries
+
+
+def _llms_entries(url):
+    text = fetch_text(url, timeout=INDEX_TIMEOUT)
+    if not text:
+        return None
+    return [(urljoin(url, link), title, description or "") for title, link, description in LLMS_LINK.findall(text)]
+
+
+def mkdocs_search(site, keyword):
+    """URL (with the section's #anchor) of the MkDocs page under site best matching keyword."""
+    entries = _load(urljoin(site, "search/search_index.json"), _mkdocs_entries)
+    return best_match(entries, keyword) if entries else None
+
+
+def sphinx_search(site, keyword):
+    """URL of the Sphinx page under site documenting keyword."""
+    entries = _load(urljoin(site, "searchindex.js"), _sphinx_entries)
+    return best_match(entries, keyword) if entries else None
+
+
+def llms_search(site, keyword, prefix=None):
+    """URL of the page listed in the site's llms.txt best matching keyword, optionally under a path prefix."""
+    entries = _load(urljoin(site, "/llms.txt"), _llms_entries)
+    if entries and prefix:
+        entries = [entry for entry in entries if urlparse(entry[0]).path.startswith(prefix)]
+    return best_match(entries, keyword) if entries else None
+
+
+def markdown_url(url):
+    """Mintlify serves every page as Markdown at the page URL plus .md."""
+    url = url.split("#", 1)[0]
+    return url if url.endswith(".md") else url.rstrip("/") + ".md"
@@ -0,0 +1,66 @@
+import os
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def page_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def text_present(locator):
+    """Like presence_of_element_located, but waits until the element has text."""
+    def condition(driver):
+        elements = driver.find_elements(*locator)
+        if elements and elements[0].text.strip():
+            return elements[0]
+        return False
+    return condition
+
+
+class LatencyBudget:
+    """
+    Total time one tool call may spend waiting on the browser.
+    Each wait polls for the DOM condition the next step needs and is cut
+    short by whatever is left of the budget; the time taken by every step is
+    recorded and printed when the budget is closed.
+    """
+
+    def __init__(self, tool, total=None, step_timeout=10, poll=0.1):
+        self.tool = tool
+        self.total = total if total is not None else float(os.getenv("TOOL_LATENCY_BUDGET", "30"))
+        self.step_timeout = step_timeout
+        self.poll = poll
+        self.steps = []
+        self.start = time.perf_counter()
+
+    def remaining(self):
+        return self.total - (time.perf_counter() - self.start)
+
+    def wait(self, driver, condition, step, timeout=None, optional=False):
+        """
+        Waits until condition(driver) is truthy and returns its value.
+        Raises TimeoutException when the step or the whole budget runs out,
+        unless optional is set, in which case None is returned.
+        """
+        timeout = min(timeout or self.step_timeout, max(self.remaining(), 0))
+        started = time.perf_counter()
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=self.poll).until(condition)
+        except TimeoutException:
+            if optional:
+                return None
+            raise
+        finally:
+            self.steps.append((step, time.perf_counter() - started))
+
+    def summary(self):
+        steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in self.steps)
+        return f"[{self.tool}] {time.perf_counter() - self.start:.2f}s of {self.total:.0f}s budget: {steps}"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        print(self.summary())